@@ -0,0 +1,48 @@
+import time
+
+import numpy as np
+
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+# Compares 'loop' and 'numpy' coverage backends on the same map. Run from repository root:
+# python -m examples.benchmark_coverage_engine
+def create_env(backend, width=200, length=200, sensors_amount=60, max_sens_range=10, seed=0):
+    rng = np.random.default_rng(seed)
+    sensors = {}
+    for sensor_id in range(sensors_amount):
+        sensors[sensor_id] = Sensor(sensor_id, int(rng.integers(width)), int(rng.integers(length)),
+                                    sensing_range=int(rng.integers(max_sens_range + 1)),
+                                    max_sensing_range=max_sens_range, operational_range=max_sens_range + 1)
+    return SensingEnvironment(sensors=sensors, width=width, length=length, backend=backend)
+
+
+def measure(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    return (time.perf_counter() - start) / repeats, result
+
+
+def benchmark(repeats=3):
+    results = {}
+    for backend in ['loop', 'numpy']:
+        env = create_env(backend)
+        sensor = env.get_sensor(0)
+        results[backend] = {
+            'get_covered_area': measure(env.get_covered_area, repeats),
+            'get_covered_by_other_sensors': measure(lambda: env.get_covered_by_other_sensors(sensor), repeats),
+            'get_covered_area_for_sensor': measure(lambda: env.get_covered_area_for_sensor(sensor), repeats),
+        }
+
+    for name in results['loop']:
+        (loop_time, loop_result) = results['loop'][name]
+        (numpy_time, numpy_result) = results['numpy'][name]
+        assert loop_result == numpy_result, f'{name}: loop={loop_result}, numpy={numpy_result}'
+        print(f'{name}: loop {loop_time * 1000:.2f}ms, numpy {numpy_time * 1000:.2f}ms, '
+              f'speedup x{loop_time / numpy_time:.1f}')
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,38 @@
+import functools
+
+import numpy as np
+
+from sensing_coverage.rollout_runner import RolloutRunner
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+# Steps environments with different alphas in parallel processes with random actions. Run from repository root:
+# python -m examples.parallel_alpha_sweep
+def create_env(alpha, max_sens_range=6):
+    sensors_dict = {
+        0: Sensor(0, 3, 2, sensing_range=1, max_sensing_range=max_sens_range),
+        1: Sensor(1, 9, 7, sensing_range=1, max_sensing_range=max_sens_range),
+        2: Sensor(2, 4, 6, sensing_range=1, max_sensing_range=max_sens_range),
+        3: Sensor(3, 7, 2, sensing_range=1, max_sensing_range=max_sens_range),
+    }
+    sensing_env = SensingEnvironment(sensors=sensors_dict, width=12, length=12)
+    return SensingCoverageParallel(env=sensing_env, max_sensing_range=max_sens_range, alpha=alpha)
+
+
+def sweep(env_alphas=(0, 0.2, 0.4, 0.6, 0.8, 1), iterations=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    mean_rewards = np.zeros(len(env_alphas))
+    with RolloutRunner([functools.partial(create_env, alpha) for alpha in env_alphas]) as runner:
+        for _ in range(iterations):
+            for actions in runner.actions:
+                actions[:, 0] = rng.integers(-1, 2, len(actions))
+            (observations, rewards) = runner.step()
+            mean_rewards += [env_rewards.mean() for env_rewards in rewards]
+    for (alpha, reward) in zip(env_alphas, mean_rewards / iterations):
+        print(f'alpha {alpha}: mean reward {reward:.3f}')
+
+
+if __name__ == '__main__':
+    sweep()
@@ -0,0 +1,143 @@
+import argparse
+import copy
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+# Times the simulator over a matrix of map sizes, sensors amounts, ranges and backends and writes results as JSON.
+# Run from repository root, e.g.:
+# python -m sensing_coverage.benchmark --sizes 100 400 --sensors 20 100 --backends numpy analytic --output results.json
+def create_env(backend, size, sensors_amount, max_range, seed=0):
+    rng = np.random.default_rng(seed)
+    sensors = {}
+    for sensor_id in range(sensors_amount):
+        sensors[sensor_id] = Sensor(sensor_id, int(rng.integers(size)), int(rng.integers(size)),
+                                    sensing_range=int(rng.integers(max_range + 1)), max_sensing_range=max_range,
+                                    operational_range=max_range + 1, sens_frequency=int(rng.integers(10, 50)),
+                                    sens_offset=int(rng.integers(10)))
+    return SensingEnvironment(sensors=sensors, width=size, length=size, jitter_time_max=1000, backend=backend)
+
+
+def perturb(env, rng):
+    """
+    Changes ranges, frequencies and offsets of all sensors by -1, 0 or 1, so cached results are not reused
+    """
+    registry = env.registry
+    rows = np.arange(len(registry))
+    registry.adjust_sensing_range(rows, rng.integers(-1, 2, len(rows)))
+    registry.adjust_frequency(rows, rng.integers(-1, 2, len(rows)))
+    registry.adjust_offset(rows, rng.integers(-1, 2, len(rows)))
+
+
+def measure(env, func, repeats, rng):
+    """
+    :return: average time in seconds of given function called after each perturbation of sensors
+    """
+    total = 0.0
+    for _ in range(repeats):
+        perturb(env, rng)
+        start = time.perf_counter()
+        func()
+        total += time.perf_counter() - start
+    return total / repeats
+
+
+def local_observations(env):
+    for (sensor_id, sensor) in env.get_sensors():
+        env.get_covered_area_for_sensor_operational_range(sensor)
+        env.get_operational_max_for_sensor(sensor)
+        env.get_covered_by_other_sensors(sensor)
+
+
+def local_kernel(env):
+    kernel = env.get_local_coverage_kernel()
+    kernel(0, len(env.registry))
+
+
+def benchmark_case(backend, size, sensors_amount, max_range, repeats, seed=0):
+    """
+    :return: dictionary with parameters of the case, average times of measured functions, steps per second,
+    snapshots and restores of state per second and peak memory of creating the environment and making one step
+    """
+    rng = np.random.default_rng(seed)
+    env = create_env(backend, size, sensors_amount, max_range, seed)
+    parallel_env = SensingCoverageParallel(env, max_sensing_range=max_range, array_output=True)
+    parallel_env.step({})
+    actions = np.zeros((sensors_amount, 3), dtype=np.int64)
+    step_time = measure(env, lambda: parallel_env.step(actions), repeats, rng)
+    result = {
+        'backend': backend, 'size': size, 'sensors': sensors_amount, 'max_range': max_range, 'repeats': repeats,
+        'step_s': step_time,
+        'steps_per_s': 1 / step_time,
+        'get_covered_area_s': measure(env, env.get_covered_area, repeats, rng),
+        'get_jitter_s': measure(env, env.get_jitter, repeats, rng),
+        'local_observations_s': measure(env, lambda: local_observations(env), repeats, rng),
+        'local_kernel_s': None,
+    }
+    if env.get_local_coverage_kernel() is not None:
+        result['local_kernel_s'] = measure(env, lambda: local_kernel(env), repeats, rng)
+    state = parallel_env.get_state()
+    result['state_bytes'] = state.nbytes
+    # restores follow perturbations, so each of them really changes state
+    snapshot_time = measure(env, lambda: parallel_env.get_state(state), repeats, rng)
+    restore_time = measure(env, lambda: parallel_env.set_state(state), repeats, rng)
+    result['snapshot_restores_per_s'] = 1 / (snapshot_time + restore_time)
+    result['deepcopy_s'] = measure(env, lambda: copy.deepcopy(env), repeats, rng)
+
+    # tracing slows everything down, so memory is measured in a separate run
+    tracemalloc.start()
+    env = create_env(backend, size, sensors_amount, max_range, seed)
+    SensingCoverageParallel(env, max_sensing_range=max_range, array_output=True).step(actions)
+    result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def run(backends, sizes, sensors_amounts, max_ranges, repeats, seed=0):
+    """
+    :return: dictionary with description of the machine and list of results of every combination of parameters
+    """
+    results = []
+    for (backend, size, sensors_amount, max_range) in itertools.product(backends, sizes, sensors_amounts, max_ranges):
+        result = benchmark_case(backend, size, sensors_amount, max_range, repeats, seed)
+        print(f"{backend} size={size} sensors={sensors_amount} range={max_range}: "
+              f"{result['steps_per_s']:.1f} steps/s, {result['snapshot_restores_per_s']:.0f} snapshot+restores/s, "
+              f"peak {result['peak_memory_bytes'] / 2 ** 20:.1f}MiB",
+              file=sys.stderr)
+        results.append(result)
+    return {
+        'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark of sensing coverage simulator')
+    parser.add_argument('--backends', nargs='+', default=['numpy', 'analytic', 'quadtree', 'sampling'])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 400])
+    parser.add_argument('--sensors', nargs='+', type=int, default=[20, 100])
+    parser.add_argument('--ranges', nargs='+', type=int, default=[5, 15])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='path of JSON file with results, printed to stdout if not given')
+    args = parser.parse_args(args)
+    report = run(args.backends, args.sizes, args.sensors, args.ranges, args.repeats, args.seed)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import math
+
+import numpy as np
+
+# arcs and segments shorter than it are skipped, they are results of tangent or duplicated intersections
+min_piece = 1e-12
+
+
+def union_area(circles, rect, clip=None):
+    """
+    Calculates exact area of union of circles intersected with a rectangle and optionally with a clip circle. Area is
+    integrated along the boundary of the region with Green's theorem: the boundary is made of arcs of circles, arcs of
+    clip circle and segments of rectangle's edges, each cut at intersection points and kept if its middle point lies
+    on the boundary of the region.
+
+    :param circles: 2D float array of rows (center x, center y, radius)
+    :param rect: tuple (min x, min y, max x, max y)
+    :param clip: optional tuple (center x, center y, radius) of a circle which the region is limited to
+    :return: area as a float
+    """
+    circles = np.asarray(circles, dtype=np.float64).reshape(-1, 3)
+    circles = circles[circles[:, 2] > 0]
+    if clip is not None:
+        if clip[2] <= 0:
+            return 0.0
+        clip = np.asarray(clip, dtype=np.float64)
+        distance = np.hypot(circles[:, 0] - clip[0], circles[:, 1] - clip[1])
+        if np.any(distance + clip[2] <= circles[:, 2]):
+            # a circle equal to the clip circle or containing it covers the whole region, boundary arcs shared by both
+            # circles would be otherwise counted twice or not at all
+            return union_area(clip[None, :], rect)
+        circles = circles[distance < circles[:, 2] + clip[2]]
+    (min_x, min_y, max_x, max_y) = rect
+    if len(circles) == 0 or min_x >= max_x or min_y >= max_y:
+        return 0.0
+    # circles hidden inside other circles don't contribute to the boundary, of identical circles the first one is kept
+    circles = circles[~_contained(circles)]
+
+    # only circles overlapping a circle can cut it or hide its arcs
+    distances = np.hypot(circles[:, None, 0] - circles[None, :, 0], circles[:, None, 1] - circles[None, :, 1])
+    overlapping = distances < circles[:, None, 2] + circles[None, :, 2]
+    np.fill_diagonal(overlapping, False)
+
+    area = 0.0
+    for index in range(len(circles)):
+        others = circles[overlapping[index]]
+        (angles, points) = _arcs(circles[index], others, rect, clip)
+        keep = _inside_rect(points, rect) & ~_inside_any(points, others)
+        if clip is not None:
+            keep &= _inside_any(points, clip[None, :])
+        area += _arcs_integral(circles[index], angles, keep)
+
+    if clip is not None:
+        (angles, points) = _arcs(clip, circles, rect, None)
+        keep = _inside_rect(points, rect) & _inside_any(points, circles)
+        area += _arcs_integral(clip, angles, keep)
+
+    corners = [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)]
+    for (start, end) in zip(corners, corners[1:] + corners[:1]):
+        (params, points) = _segments(start, end, circles, clip)
+        keep = _inside_any(points, circles)
+        if clip is not None:
+            keep &= _inside_any(points, clip[None, :])
+        keep &= np.diff(params) > min_piece
+        (points_from, points_to) = (_lerp(start, end, params[:-1][keep]), _lerp(start, end, params[1:][keep]))
+        area += float((points_from[0] * points_to[1] - points_to[0] * points_from[1]).sum()) / 2
+    return float(area)
+
+
+def _contained(circles):
+    dx = circles[:, None, 0] - circles[None, :, 0]
+    dy = circles[:, None, 1] - circles[None, :, 1]
+    distance = np.hypot(dx, dy)
+    reach = distance + circles[:, None, 2]
+    earlier = np.tri(len(circles), k=-1, dtype=bool)
+    inside = (reach < circles[None, :, 2]) | ((reach == circles[None, :, 2]) & (earlier | (distance > 0)))
+    np.fill_diagonal(inside, False)
+    return inside.any(axis=1)
+
+
+def _arcs(circle, others, rect, clip):
+    # angles cutting the circle into arcs and middle points of these arcs
+    (center_x, center_y, radius) = circle
+    cutting = others if clip is None else np.vstack((others, clip[None, :]))
+    (dx, dy, other_radius) = (cutting[:, 0] - center_x, cutting[:, 1] - center_y, cutting[:, 2])
+    distance = np.hypot(dx, dy)
+    crossing = (np.abs(radius - other_radius) < distance) & (distance < radius + other_radius)
+    (dx, dy, other_radius, distance) = (dx[crossing], dy[crossing], other_radius[crossing], distance[crossing])
+    base = np.arctan2(dy, dx)
+    spread = np.arccos(np.clip((radius ** 2 - other_radius ** 2 + distance ** 2) / (2 * distance * radius), -1, 1))
+    angles = [base - spread, base + spread]
+    (min_x, min_y, max_x, max_y) = rect
+    for (line, vertical) in ((min_x, True), (max_x, True), (min_y, False), (max_y, False)):
+        shift = line - (center_x if vertical else center_y)
+        if abs(shift) < radius:
+            spread = math.acos(shift / radius)
+            if vertical:
+                angles.append([spread, -spread])
+            else:
+                angles.append([math.pi / 2 - spread, math.pi / 2 + spread])
+    angles = np.sort(np.mod(np.concatenate(angles), 2 * math.pi))
+    angles = np.concatenate(([0.0], angles, [2 * math.pi]))
+    middles = (angles[:-1] + angles[1:]) / 2
+    points = np.stack((center_x + radius * np.cos(middles), center_y + radius * np.sin(middles)), axis=1)
+    return angles, points
+
+
+def _arcs_integral(circle, angles, keep):
+    (center_x, center_y, radius) = circle
+    (start, end) = (angles[:-1], angles[1:])
+    keep = keep & (end - start > min_piece)
+    integral = radius * center_x * (np.sin(end) - np.sin(start)) - radius * center_y * (np.cos(end) - np.cos(start)) \
+        + radius ** 2 * (end - start)
+    return float(integral[keep].sum()) / 2
+
+
+def _segments(start, end, circles, clip):
+    # parameters in [0, 1] cutting segment from start to end and middle points of the pieces
+    cutting = circles if clip is None else np.vstack((circles, clip[None, :]))
+    direction = (end[0] - start[0], end[1] - start[1])
+    length_squared = direction[0] ** 2 + direction[1] ** 2
+    (relative_x, relative_y) = (start[0] - cutting[:, 0], start[1] - cutting[:, 1])
+    half_b = relative_x * direction[0] + relative_y * direction[1]
+    c = relative_x ** 2 + relative_y ** 2 - cutting[:, 2] ** 2
+    discriminant = half_b ** 2 - length_squared * c
+    (half_b, root) = (half_b[discriminant > 0], np.sqrt(discriminant[discriminant > 0]))
+    params = np.concatenate(([0.0, 1.0], (-half_b - root) / length_squared, (-half_b + root) / length_squared))
+    params = np.unique(np.clip(params, 0.0, 1.0))
+    middles = (params[:-1] + params[1:]) / 2
+    points = np.stack((start[0] + middles * direction[0], start[1] + middles * direction[1]), axis=1)
+    return params, points
+
+
+def _lerp(start, end, param):
+    return start[0] + param * (end[0] - start[0]), start[1] + param * (end[1] - start[1])
+
+
+def _inside_rect(points, rect):
+    (min_x, min_y, max_x, max_y) = rect
+    return (points[:, 0] >= min_x) & (points[:, 0] <= max_x) & (points[:, 1] >= min_y) & (points[:, 1] <= max_y)
+
+
+def _inside_any(points, circles):
+    if len(circles) == 0:
+        return np.full(len(points), False)
+    dx = points[:, None, 0] - circles[None, :, 0]
+    dy = points[:, None, 1] - circles[None, :, 1]
+    return (dx ** 2 + dy ** 2 < circles[None, :, 2] ** 2).any(axis=1)
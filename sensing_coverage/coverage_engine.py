@@ -0,0 +1,383 @@
+import numpy as np
+
+from sensing_coverage.circle_union import union_area
+from sensing_coverage.halton import halton_points
+from sensing_coverage.quadtree import covered_cells
+from sensing_coverage.stencil import disk_window, paste_disk
+from sensing_coverage.window_mask import WindowMask
+
+# upper bound of (sample point, sensor) pairs tested at once by SamplingCoverageEngine
+max_sample_pairs = 1 << 22
+
+
+class CoverageEngine:
+    """
+    Base class of coverage engines. Coverage engine computes masks and cell counts for given SensingEnvironment,
+    which delegates all its coverage queries to engine selected by its backend name.
+
+    Attributes
+    ----------
+    env: SensingEnvironment
+        environment which sensors and map size are used in computations
+    """
+
+    def __init__(self, env):
+        self.env = env
+
+    def sensing_area(self, sensor, range):
+        """
+        :return: 2D bool array where True means positions within given range from given sensor
+        """
+        (xx, yy) = np.ogrid[:self.env.width, :self.env.length]
+        dist_from_center = np.sqrt((xx - sensor.x) ** 2 + (yy - sensor.y) ** 2)
+        return dist_from_center <= range
+
+    def sensing_window(self, sensor, range):
+        """
+        :return: WindowMask of positions within given range from given sensor
+        """
+        return WindowMask.from_dense(self.sensing_area(sensor, range))
+
+    def coverage_area(self, sensor_to_skip=None):
+        """
+        :return: 2D bool array where True means positions covered by all sensors excluding given one
+        """
+        raise NotImplementedError
+
+    def operational_coverage_area(self, sensor, include_sensor):
+        """
+        :return: 2D bool array where True means positions within operational_range of given sensor covered by
+        other sensors (and by sensor itself if include_sensor is True)
+        """
+        raise NotImplementedError
+
+    def operational_coverage_window(self, sensor, include_sensor):
+        """
+        :return: WindowMask version of operational_coverage_area
+        """
+        return WindowMask.from_dense(self.operational_coverage_area(sensor, include_sensor))
+
+    def count(self, arr):
+        """
+        :return: amount of True values in given bool array
+        """
+        raise NotImplementedError
+
+    def covered_area(self):
+        return self.count(self.coverage_area())
+
+    def covered_in_operational_range(self, sensor, include_sensor):
+        return self.count(self.operational_coverage_area(sensor, include_sensor))
+
+    def operational_max(self, sensor):
+        return self.count(self.sensing_area(sensor, sensor.operational_range))
+
+    def sensor_covered_area(self, sensor):
+        return self.sensing_window(sensor, sensor.sensing_range).count()
+
+    def local_coverage_kernel(self):
+        """
+        :return: function of (start, stop) which returns (stop - start, 2) float array of local observations (part of
+        operational area which is covered, part of map covered by other sensors within operational area) of registry
+        rows from start to stop; it only reads state prepared by this call, so it can be called from many threads at
+        once. None if engine has no such batched computation and sensors have to be queried one by one
+        """
+        return None
+
+
+class LoopCoverageEngine(CoverageEngine):
+    """
+    Engine which builds union of sensors' masks and counts covered cells by iterating over each cell in pure Python.
+    It is slow and it is kept only as a reference for NumpyCoverageEngine results and benchmarks.
+    """
+
+    def coverage_area(self, sensor_to_skip=None):
+        sensor_to_skip_id = None
+        if sensor_to_skip is not None:
+            sensor_to_skip_id = sensor_to_skip.id
+
+        covered_area = np.full((self.env.width, self.env.length), False)
+        for sensor in self.env.sensors.values():
+            if sensor.id != sensor_to_skip_id:
+                area = self.sensing_area(sensor, sensor.sensing_range)
+                for ind_x, row in enumerate(area):
+                    for ind_y, y in enumerate(row):
+                        if y:
+                            covered_area[(ind_x, ind_y)] = True
+        return covered_area
+
+    def operational_coverage_area(self, sensor, include_sensor):
+        operational_area = self.sensing_area(sensor, sensor.operational_range)
+        result = np.full((self.env.width, self.env.length), False)
+        if include_sensor:
+            sensor_to_skip = None
+        else:
+            sensor_to_skip = sensor
+        for ind_x, row in enumerate(self.coverage_area(sensor_to_skip)):
+            for ind_y, y in enumerate(row):
+                if y and operational_area[ind_x, ind_y]:
+                    result[ind_x, ind_y] = True
+        return result
+
+    def count(self, arr):
+        covered_fields = 0
+        for x in arr:
+            for y in x:
+                if y:
+                    covered_fields += 1
+        return covered_fields
+
+
+class NumpyCoverageEngine(CoverageEngine):
+    """
+    Engine which pastes cached disk stencils into the map instead of computing distances over the whole map and
+    answers coverage queries from environment's CoverageGrid with whole-array NumPy operations limited to windows
+    of sensors' disks. Operational windows of environment's sensors and their cell counts are taken from its
+    StaticGeometry. Until the grid is built, queries about operational range of a sensor use only its neighbors. It is
+    the default backend of SensingEnvironment.
+    """
+
+    def sensing_area(self, sensor, range):
+        area = np.full((self.env.width, self.env.length), False)
+        return paste_disk(area, sensor.x, sensor.y, range)
+
+    def coverage_area(self, sensor_to_skip=None):
+        grid = self.env.coverage_grid.refresh()
+        if sensor_to_skip is None:
+            return grid.covered.copy()
+        counts = grid.counts.copy()
+        own_window = self.__own_window(sensor_to_skip)
+        if own_window is not None:
+            (slices, stencil) = own_window
+            counts[slices] -= stencil
+        return counts > 0
+
+    def sensing_window(self, sensor, range):
+        return WindowMask.disk(sensor.x, sensor.y, range, self.env.width, self.env.length)
+
+    def operational_coverage_area(self, sensor, include_sensor):
+        return self.operational_coverage_window(sensor, include_sensor).to_dense()
+
+    def operational_coverage_window(self, sensor, include_sensor):
+        window = self.__operational_window(sensor)
+        if window is None:
+            return WindowMask.empty(self.env.width, self.env.length)
+        (slices, stencil) = window
+        mask = stencil & self.__covered_window(slices, sensor, include_sensor)
+        return WindowMask(slices[0].start, slices[1].start, mask, self.env.width, self.env.length)
+
+    def count(self, arr):
+        return int(np.count_nonzero(arr))
+
+    def covered_area(self):
+        return self.env.coverage_grid.refresh().covered_cells
+
+    def covered_in_operational_range(self, sensor, include_sensor):
+        return self.operational_coverage_window(sensor, include_sensor).count()
+
+    def operational_max(self, sensor):
+        geometry = self.env.geometry
+        if geometry.owns(sensor):
+            return int(geometry.refresh().operational_cells[sensor._row])
+        window = self.__operational_window(sensor)
+        if window is None:
+            return 0
+        return int(np.count_nonzero(window[1]))
+
+    def local_coverage_kernel(self):
+        grid = self.env.coverage_grid
+        if not grid.valid:
+            return None
+        counts = grid.refresh().counts.ravel()
+        geometry = self.env.geometry.refresh()
+        registry = self.env.registry
+        own_cells = geometry.own_cells(registry.sensing_range)
+        area = self.env.get_area()
+
+        def kernel(start, stop):
+            (covered, other_covered) = geometry.operational_counts(counts, own_cells, start, stop)
+            operational_max = geometry.operational_cells[start:stop]
+            coverages = np.zeros((stop - start, 2))
+            np.divide(covered, operational_max, out=coverages[:, 0],
+                      where=(operational_max > 0) & ~registry.crashed[start:stop])
+            coverages[:, 1] = other_covered / area
+            return coverages
+
+        return kernel
+
+    def __operational_window(self, sensor):
+        geometry = self.env.geometry
+        if geometry.owns(sensor):
+            return geometry.refresh().operational_windows[sensor._row]
+        return disk_window(sensor.x, sensor.y, sensor.operational_range, self.env.width, self.env.length)
+
+    def __own_window(self, sensor):
+        # sensors are skipped by id, so the disk of environment's sensor with the same id is taken
+        own_sensor = self.env.sensors.get(sensor.id)
+        if own_sensor is None:
+            return None
+        return disk_window(own_sensor.x, own_sensor.y, own_sensor.sensing_range, self.env.width, self.env.length)
+
+    def __covered_window(self, slices, sensor, include_sensor):
+        grid = self.env.coverage_grid
+        if not grid.valid:
+            # building the whole grid costs more than a single local query, so only neighbors are taken
+            return self.__neighbors_covered_window(slices, sensor, include_sensor)
+        grid.refresh()
+        if include_sensor:
+            return grid.covered_window(slices)
+        return grid.covered_window(slices, self.__own_window(sensor))
+
+    def __neighbors_covered_window(self, slices, sensor, include_sensor):
+        neighbors = [self.sensing_window(neighbor, neighbor.sensing_range)
+                     for neighbor in self.env.get_neighbors(sensor) if include_sensor or neighbor.id != sensor.id]
+        covered = WindowMask.union_all(neighbors, self.env.width, self.env.length)
+        return covered.crop(slices[0].start, slices[1].start, slices[0].stop - slices[0].start,
+                            slices[1].stop - slices[1].start)
+
+
+class AnalyticCoverageEngine(NumpyCoverageEngine):
+    """
+    Engine which treats sensors' ranges as continuous disks and the map as rectangle [-0.5, width - 0.5] x
+    [-0.5, length - 0.5], in which every cell is a unit square around its position. Scalar queries return exact area
+    of union of disks clipped to the map (and to operational disk for local queries), so their cost depends on amount
+    of sensors and not on map size and they are not limited by its resolution. A disk of range 0 has no area.
+    Masks are still rasterized by NumpyCoverageEngine.
+    """
+
+    def __init__(self, env):
+        super().__init__(env)
+        self.__covered = (None, 0.0)
+
+    def covered_area(self):
+        registry = self.env.registry
+        if self.__covered[0] != registry.version:
+            self.__covered = (registry.version, union_area(self.__disks(), self.__rect()))
+        return self.__covered[1]
+
+    def local_coverage_kernel(self):
+        # local coverage is not counted in cells of the grid
+        return None
+
+    def covered_in_operational_range(self, sensor, include_sensor):
+        registry = self.env.registry
+        rows = self.env.get_neighbor_rows(sensor)
+        if not include_sensor:
+            rows = rows[registry.id[rows] != sensor.id]
+        return union_area(self.__disks()[rows], self.__rect(), (sensor.x, sensor.y, sensor.operational_range))
+
+    def operational_max(self, sensor):
+        return union_area([(sensor.x, sensor.y, sensor.operational_range)], self.__rect())
+
+    def sensor_covered_area(self, sensor):
+        return union_area([(sensor.x, sensor.y, sensor.sensing_range)], self.__rect())
+
+    def __disks(self):
+        registry = self.env.registry
+        return np.column_stack((registry.x, registry.y, registry.sensing_range))
+
+    def __rect(self):
+        return -0.5, -0.5, self.env.width - 0.5, self.env.length - 0.5
+
+
+class QuadtreeCoverageEngine(NumpyCoverageEngine):
+    """
+    Engine which counts covered cells of the whole map with a quadtree of blocks classified as fully covered, uncovered
+    or mixed by sensors' disks, so only blocks crossed by edges of disks are refined. With environment's
+    coverage_tolerance greater than 0 refining stops earlier and the count is an estimation with error not greater
+    than coverage_tolerance * map area. The whole map grid is never built for global coverage, which makes it
+    suitable for very large maps; queries about a single sensor are answered within its window like in
+    NumpyCoverageEngine.
+    """
+
+    def __init__(self, env):
+        super().__init__(env)
+        self.__covered = (None, 0)
+
+    def covered_area(self):
+        registry = self.env.registry
+        if self.__covered[0] != registry.version:
+            disks = np.column_stack((registry.x, registry.y, registry.sensing_range))
+            self.__covered = (registry.version, covered_cells(disks, self.env.width, self.env.length,
+                                                              self.env.coverage_tolerance))
+        return self.__covered[1]
+
+
+class SamplingCoverageEngine(NumpyCoverageEngine):
+    """
+    Engine which estimates coverage from a fixed set of env.coverage_samples points of Halton low-discrepancy sequence
+    spread over map rectangle [-0.5, width - 0.5] x [-0.5, length - 0.5]. Each point stands for the same part of map
+    area and counts as covered if it lies within any sensor's disk, so cost of queries depends on amount of samples
+    and not on map size. For each point amount of sensors covering it is computed once per change of sensors with
+    vectorized distance tests against all sensors. Masks are still rasterized by NumpyCoverageEngine.
+
+    Attributes
+    ----------
+    points: 2D float array
+        contiguous (coverage_samples, 2) array of x and y of sample points
+    sample_area: number
+        part of map area represented by one sample point
+    """
+
+    def __init__(self, env):
+        super().__init__(env)
+        assert env.coverage_samples > 0, 'at least one sample point is needed'
+        unit_points = halton_points(env.coverage_samples)
+        # points are sorted by x, so points near a sensor are found by binary search
+        unit_points = unit_points[np.argsort(unit_points[:, 0], kind='stable')]
+        self.points = np.ascontiguousarray(unit_points * (env.width, env.length) - 0.5)
+        self.sample_area = env.width * env.length / env.coverage_samples
+        self.__counts = (None, None)
+
+    def covered_area(self):
+        return int(np.count_nonzero(self.__point_counts())) * self.sample_area
+
+    def local_coverage_kernel(self):
+        # local coverage is not counted in cells of the grid
+        return None
+
+    def covered_in_operational_range(self, sensor, include_sensor):
+        inside = self.__inside(sensor.x, sensor.y, sensor.operational_range)
+        counts = self.__point_counts()[inside]
+        if not include_sensor:
+            registry = self.env.registry
+            for row in np.flatnonzero(registry.id == sensor.id):
+                (dx, dy) = (self.points[inside, 0] - registry.x[row], self.points[inside, 1] - registry.y[row])
+                counts = counts - (dx ** 2 + dy ** 2 <= registry.sensing_range[row] ** 2)
+        return int(np.count_nonzero(counts)) * self.sample_area
+
+    def operational_max(self, sensor):
+        return len(self.__inside(sensor.x, sensor.y, sensor.operational_range)) * self.sample_area
+
+    def sensor_covered_area(self, sensor):
+        return len(self.__inside(sensor.x, sensor.y, sensor.sensing_range)) * self.sample_area
+
+    def __inside(self, x, y, radius):
+        # indices of sample points within radius from (x, y)
+        start = int(np.searchsorted(self.points[:, 0], x - radius, side='left'))
+        stop = int(np.searchsorted(self.points[:, 0], x + radius, side='right'))
+        (dx, dy) = (self.points[start:stop, 0] - x, self.points[start:stop, 1] - y)
+        return start + np.flatnonzero(dx ** 2 + dy ** 2 <= radius ** 2)
+
+    def __point_counts(self):
+        # for each sample point amount of sensors covering it
+        registry = self.env.registry
+        if self.__counts[0] != registry.version:
+            counts = np.zeros(len(self.points), dtype=np.int32)
+            step = max(1, max_sample_pairs // len(self.points))
+            for start in range(0, len(registry), step):
+                rows = slice(start, start + step)
+                dx = self.points[:, 0, None] - registry.x[None, rows]
+                dy = self.points[:, 1, None] - registry.y[None, rows]
+                counts += np.count_nonzero(dx ** 2 + dy ** 2 <= registry.sensing_range[None, rows] ** 2, axis=1)
+            self.__counts = (registry.version, counts)
+        return self.__counts[1]
+
+
+coverage_backends = {
+    'loop': LoopCoverageEngine,
+    'numpy': NumpyCoverageEngine,
+    'analytic': AnalyticCoverageEngine,
+    'quadtree': QuadtreeCoverageEngine,
+    'sampling': SamplingCoverageEngine,
+}
@@ -0,0 +1,152 @@
+import numpy as np
+
+from sensing_coverage.stencil import disk_window, ring_window, window_overlap
+
+
+class CoverageGrid:
+    """
+    Coverage of SensingEnvironment map shared by all coverage queries. It is built once and then kept up to date
+    incrementally: on first query after some sensors changed only cells of their old and new disks are updated - a ring
+    of cells when sensor's range changes, whole disks when sensor moves, crashes or is removed.
+
+
+    Attributes
+    ----------
+    env: SensingEnvironment
+        environment which sensors are covering the grid
+    counts: 2D int array
+        for each map position amount of sensors covering it, allocated on first refresh
+    covered: 2D bool array
+        True means position covered by at least one sensor, allocated on first refresh
+    covered_cells: number
+        amount of positions covered by at least one sensor, kept as a running counter
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.counts = None
+        self.covered = None
+        self.covered_cells = 0
+        self.valid = False
+        # sensor id -> (x, y, sensing_range) of the disk which is currently added to counts
+        self.applied = {}
+        # sensor id -> sensor which changed since last refresh
+        self.changed = {}
+
+    def invalidate(self, sensor=None):
+        """
+        Marks given sensor as changed, if no sensor is given whole grid will be rebuilt
+        """
+        if sensor is None:
+            self.valid = False
+        else:
+            self.changed[sensor.id] = sensor
+
+    def refresh(self):
+        """
+        :return: the grid itself after applying changes of sensors which changed since last refresh
+        """
+        if not self.valid:
+            self.__rebuild()
+        elif self.changed:
+            for (sensor_id, sensor) in self.changed.items():
+                self.__update(sensor_id, sensor)
+        self.changed.clear()
+        return self
+
+    def state_nbytes(self):
+        """
+        :return: size in bytes of buffer used by save_state and load_state
+        """
+        cells = self.env.width * self.env.length
+        return 8 + cells * (np.dtype(np.int32).itemsize + 1)
+
+    def save_state(self, buffer):
+        """
+        Copies covered_cells, counts and covered of refreshed grid one after another into given 1D uint8 array of
+        size state_nbytes()
+        """
+        assert self.valid and not self.changed, 'only refreshed grid can be saved'
+        buffer[:8].view(np.int64)[0] = self.covered_cells
+        end = 8 + self.counts.nbytes
+        buffer[8:end].view(np.int32)[...] = self.counts.ravel()
+        buffer[end:].view(bool)[...] = self.covered.ravel()
+
+    def load_state(self, buffer):
+        """
+        Restores grid saved by save_state, sensors of the environment have to be already in the state they had when
+        the grid was saved
+        """
+        if self.counts is None:
+            self.counts = np.zeros((self.env.width, self.env.length), dtype=np.int32)
+            self.covered = np.full((self.env.width, self.env.length), False)
+        self.covered_cells = int(buffer[:8].view(np.int64)[0])
+        end = 8 + self.counts.nbytes
+        self.counts.ravel()[...] = buffer[8:end].view(np.int32)
+        self.covered.ravel()[...] = buffer[end:].view(bool)
+        registry = self.env.registry
+        self.applied = dict(zip(registry.id.tolist(), zip(registry.x.tolist(), registry.y.tolist(),
+                                                          registry.sensing_range.tolist())))
+        self.changed.clear()
+        self.valid = True
+
+    def __rebuild(self):
+        if self.counts is None:
+            self.counts = np.zeros((self.env.width, self.env.length), dtype=np.int32)
+            self.covered = np.full((self.env.width, self.env.length), False)
+        self.counts.fill(0)
+        self.applied.clear()
+        for sensor in self.env.sensors.values():
+            window = disk_window(sensor.x, sensor.y, sensor.sensing_range, self.env.width, self.env.length)
+            if window is not None:
+                (slices, stencil) = window
+                self.counts[slices] += stencil
+            self.applied[sensor.id] = (sensor.x, sensor.y, sensor.sensing_range)
+        np.greater(self.counts, 0, out=self.covered)
+        self.covered_cells = int(np.count_nonzero(self.covered))
+        self.valid = True
+
+    def __update(self, sensor_id, sensor):
+        old = self.applied.pop(sensor_id, None)
+        new = None
+        if self.env.sensors.get(sensor_id) is sensor:
+            new = (sensor.x, sensor.y, sensor.sensing_range)
+            self.applied[sensor_id] = new
+        if old == new:
+            return
+        if old is not None and new is not None and old[:2] == new[:2]:
+            self.__add(ring_window(old[0], old[1], old[2], new[2], self.env.width, self.env.length), 1)
+            return
+        if old is not None:
+            self.__add(disk_window(old[0], old[1], old[2], self.env.width, self.env.length), -1)
+        if new is not None:
+            self.__add(disk_window(new[0], new[1], new[2], self.env.width, self.env.length), 1)
+
+    def __add(self, window, sign):
+        if window is None:
+            return
+        (slices, stencil) = window
+        counts = self.counts[slices]
+        covered = self.covered[slices]
+        before = np.count_nonzero(covered)
+        if sign > 0:
+            counts += stencil
+        else:
+            counts -= stencil
+        np.greater(counts, 0, out=covered)
+        self.covered_cells += int(np.count_nonzero(covered)) - before
+
+    def covered_window(self, slices, own_window=None):
+        """
+        :param slices: pair of slices selecting a window of the map
+        :param own_window: optional (slices, stencil) window of a sensor's disk which coverage is not taken into account
+        :return: 2D bool array of window's shape where True means position covered by some sensor
+        """
+        if own_window is None:
+            return self.covered[slices]
+        counts = self.counts[slices].copy()
+        overlap = window_overlap(slices, own_window[0])
+        if overlap is not None:
+            (window_part, own_part) = overlap
+            counts[window_part] -= own_window[1][own_part]
+        return counts > 0
@@ -0,0 +1,125 @@
+import math
+import os
+
+import numpy as np
+
+from sensing_coverage.png import write_png
+from sensing_coverage.stencil import paste_disk
+
+# RGB colors of frames, also used by SensingEnvRender
+map_color = (169, 169, 169)
+cover_color = (0, 0, 255)
+operational_color = (255, 0, 0)
+sensor_color = (0, 255, 0)
+line_color = (0, 0, 0)
+bg_color = (255, 255, 255)
+
+# palette indexed by layer codes of frame pixels: map, covered, operational outline, sensor, grid line
+palette = np.array([map_color, cover_color, operational_color, sensor_color, line_color], dtype=np.uint8)
+
+# default size in pixels of one map cell in frames
+frame_scale = 4
+
+
+def rasterize(covered, operational=None, sensors=None, scale=frame_scale):
+    """
+    Draws map cells as scale x scale squares without any per-cell Python loop. A cell looks the same as every other
+    cell with the same combination of covered, operational and sensor flags, so a pixel tile of each of 8 combinations
+    is drawn once and the frame is gathered from tiles indexed by cells' combinations. Covered cells are filled,
+    cells within operational ranges get an outline, sensors' cells get a dot and grid lines are drawn on top, like in
+    SensingEnvRender.render_accurate. Outlines and grid lines are drawn only when scale is at least 3 pixels.
+
+    :param covered: 2D bool array (width, length) of covered map positions
+    :param operational: optional 2D bool array (width, length) of positions within operational range of any sensor
+    :param sensors: optional 2D bool array (width, length) of positions of sensors
+    :return: (length * scale, width * scale, 3) uint8 RGB array, rows are y and columns are x of the map
+    """
+    (width, length) = covered.shape
+    combinations = covered.T.astype(np.uint8)
+    if operational is not None:
+        combinations |= operational.T.astype(np.uint8) << 1
+    if sensors is not None:
+        combinations |= sensors.T.astype(np.uint8) << 2
+    tiles = palette[_tile_codes(scale)]
+    # (length, width, scale, scale, 3) tiles are reordered, so pixels of each row of cells form rows of the frame
+    frame = tiles[combinations].transpose(0, 2, 1, 3, 4)
+    return np.ascontiguousarray(frame).reshape(length * scale, width * scale, 3)
+
+
+def _tile_codes(scale):
+    # codes of palette colors of pixels of a cell for each combination of covered (bit 0), operational (bit 1)
+    # and sensor (bit 2) flags
+    combinations = np.arange(8)[:, None, None]
+    codes = np.broadcast_to(combinations & 1, (8, scale, scale)).astype(np.uint8)
+    (yy, xx) = np.ogrid[:scale, :scale]
+    if scale >= 3:
+        border = max(1, scale // 15)
+        outline = (np.minimum(yy, scale - 1 - yy) < border) | (np.minimum(xx, scale - 1 - xx) < border)
+        codes[((combinations & 2) > 0) & outline] = 2
+    dot = (yy + 0.5 - scale / 2) ** 2 + (xx + 0.5 - scale / 2) ** 2 <= (scale / 2) ** 2
+    codes[((combinations & 4) > 0) & dot] = 3
+    if scale >= 3:
+        codes[:, 0, :] = 4
+        codes[:, :, 0] = 4
+    return codes
+
+
+def render_frame(env, scale=frame_scale):
+    """
+    :return: RGB array of current coverage, operational ranges and sensors of given SensingEnvironment drawn by
+    rasterize; it needs no display and no pygame
+    """
+    (width, length) = (env.get_width(), env.get_length())
+    operational = np.full((width, length), False)
+    sensors = np.full((width, length), False)
+    for (sensor_id, sensor) in env.get_sensors():
+        paste_disk(operational, sensor.x, sensor.y, sensor.operational_range)
+        (ind_x, ind_y) = (math.floor(sensor.x), math.floor(sensor.y))
+        if 0 <= ind_x < width and 0 <= ind_y < length:
+            sensors[ind_x, ind_y] = True
+    return rasterize(env.get_sensing_coverage_area(), operational, sensors, scale)
+
+
+class FrameRecorder:
+    """
+    Collects frames, e.g. of SensingCoverageParallel.render(mode='rgb_array') after each step. Frames are written as
+    a sequence of numbered PNG files to given directory, or kept in memory if no directory is given.
+
+
+    Attributes
+    ----------
+    directory(optional): str
+        directory of PNG files, created if it does not exist; if None frames are kept in frames list
+    prefix(optional): str
+        beginning of names of PNG files, followed by 6 digits of frame index
+    compress_level(optional): number
+        zlib compression level of PNG files, 1 is the fastest
+    frames: list
+        copies of appended frames, filled only if no directory is given
+    paths: list
+        paths of written PNG files
+    """
+
+    def __init__(self, directory=None, prefix='frame', compress_level=1):
+        self.directory = directory
+        self.prefix = prefix
+        self.compress_level = compress_level
+        self.frames = []
+        self.paths = []
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.frames) + len(self.paths)
+
+    def append(self, frame):
+        """
+        :return: path of written PNG file or None if frame is kept in memory
+        """
+        if self.directory is None:
+            self.frames.append(np.array(frame, dtype=np.uint8))
+            return None
+        path = os.path.join(self.directory, f'{self.prefix}{len(self):06d}.png')
+        write_png(path, frame, self.compress_level)
+        self.paths.append(path)
+        return path
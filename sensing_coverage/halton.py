@@ -0,0 +1,25 @@
+import numpy as np
+
+
+def radical_inverse(indices, base):
+    """
+    :return: 1D float array of digits of given indices in given base mirrored around the decimal point, e.g. index 6
+    (110 in base 2) gives 0.011 in base 2
+    """
+    indices = np.asarray(indices, dtype=np.int64).copy()
+    result = np.zeros(len(indices))
+    fraction = 1 / base
+    while np.any(indices > 0):
+        result += fraction * (indices % base)
+        indices //= base
+        fraction /= base
+    return result
+
+
+def halton_points(amount, bases=(2, 3)):
+    """
+    :return: contiguous 2D float array (amount, len(bases)) of the first points of Halton low-discrepancy sequence in
+    unit square, i-th coordinate uses i-th base. The point 0 is skipped, as it lies in the corner.
+    """
+    indices = np.arange(1, amount + 1)
+    return np.ascontiguousarray(np.stack([radical_inverse(indices, base) for base in bases], axis=1))
@@ -0,0 +1,153 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+
+def jitter(frequencies, offsets, time_max, max_hyperperiod=None):
+    """
+    Calculates jitter of sensors' measures made before time_max: square root of sum of squared differences between
+    each gap of two consecutive measures (of any sensors) and the average gap. Sensor with frequency 0 measures only
+    once at its offset, when there are less than two measures jitter is 0.
+
+    :param frequencies: sens_frequency of each sensor
+    :param offsets: sens_offset of each sensor
+    :param time_max: amount of time units taken under consideration
+    :param max_hyperperiod: if given and least common multiple of non zero frequencies is not greater than it, only
+    one hyperperiod of measures is marked and the rest of gaps is calculated from their repeating pattern; the result
+    is exactly the same as without it
+    :return: jitter as a float
+    """
+    frequencies = np.asarray(frequencies, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if max_hyperperiod is not None and np.any(frequencies > 0):
+        hyperperiod = math.lcm(*frequencies[frequencies > 0].tolist())
+        start = int(offsets.max()) + 1
+        if hyperperiod <= max_hyperperiod and start + hyperperiod < time_max:
+            return _hyperperiod_jitter(frequencies, offsets, time_max, start, hyperperiod)
+    gaps = np.diff(measures_timeline(frequencies, offsets, time_max).nonzero()[0])
+    return gaps_jitter(len(gaps), int(gaps.sum()), int((gaps * gaps).sum()))
+
+
+class JitterCache:
+    """
+    Bounded least recently used cache of jitter results. Jitter depends only on the multiset of sensors'
+    (sens_frequency, sens_offset) pairs and on time limit, so results are keyed by sorted pairs and reused as long as
+    timing configuration of sensors does not change, even if their ranges do.
+
+
+    Attributes
+    ----------
+    max_size: number
+        maximal amount of kept results, 0 disables caching
+    hits: number
+        amount of jitter calls answered from cache
+    misses: number
+        amount of jitter calls which had to calculate jitter
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def jitter(self, frequencies, offsets, time_max, max_hyperperiod=None):
+        """
+        :return: same result as jitter function with the same arguments
+        """
+        frequencies = np.asarray(frequencies, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        order = np.lexsort((offsets, frequencies))
+        key = (frequencies[order].tobytes(), offsets[order].tobytes(), time_max, max_hyperperiod)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        result = jitter(frequencies, offsets, time_max, max_hyperperiod)
+        if self.max_size > 0:
+            self.entries[key] = result
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def measures_timeline(frequencies, offsets, time_max):
+    """
+    :return: 1D bool array of size time_max where True means time unit in which some sensor measures
+    """
+    timeline = np.full(max(int(time_max), 0), False)
+    for (frequency, offset) in zip(frequencies.tolist(), offsets.tolist()):
+        if frequency > 0:
+            timeline[offset::frequency] = True
+        elif offset < time_max:
+            timeline[offset] = True
+    return timeline
+
+
+def gaps_jitter(gaps_amount, gaps_sum, gaps_squares_sum):
+    """
+    :return: jitter calculated from amount, sum and sum of squares of gaps, all given as ints so the variance is exact
+    """
+    if gaps_amount == 0:
+        return 0.0
+    variance = (gaps_amount * gaps_squares_sum - gaps_sum * gaps_sum) / gaps_amount
+    return math.sqrt(variance)
+
+
+def _hyperperiod_jitter(frequencies, offsets, time_max, start, hyperperiod):
+    # after the last offset measures repeat every hyperperiod, so gaps are made of gaps before start and
+    # a repeating pattern of gaps between measures of one hyperperiod
+    measures = measures_timeline(frequencies, offsets, start + hyperperiod).nonzero()[0]
+    before = measures[measures < start]
+    pattern = measures[measures >= start]
+    pattern_gaps = np.diff(np.append(pattern, pattern[0] + hyperperiod))
+
+    periods = (time_max - start) // hyperperiod
+    measures_after = periods * len(pattern) + int(np.count_nonzero(pattern + periods * hyperperiod < time_max))
+    (repeats, rest) = divmod(measures_after - 1, len(pattern))
+    gaps_sum = repeats * int(pattern_gaps.sum()) + int(pattern_gaps[:rest].sum())
+    gaps_squares_sum = repeats * int((pattern_gaps * pattern_gaps).sum()) + int((pattern_gaps[:rest] ** 2).sum())
+    gaps_amount = measures_after - 1
+    if len(before) > 0:
+        before_gaps = np.diff(np.append(before, pattern[0]))
+        gaps_amount += len(before_gaps)
+        gaps_sum += int(before_gaps.sum())
+        gaps_squares_sum += int((before_gaps * before_gaps).sum())
+    return gaps_jitter(gaps_amount, gaps_sum, gaps_squares_sum)
+
+
+def batch_jitter(frequencies, offsets, time_max):
+    """
+    Computes jitter of many environments at once. Measures of each environment are marked on its row of a bool
+    timeline with strided slices like in measures_timeline, and gaps between them are found with np.diff over all
+    timelines together.
+
+    :param frequencies: 2D int array (environments, sensors) of sensors' sens_frequency
+    :param offsets: 2D int array (environments, sensors) of sensors' sens_offset
+    :param time_max: 1D int array of environments' jitter_time_max
+    :return: 1D float array of jitters
+    """
+    envs_amount = len(time_max)
+    timelines = np.full((envs_amount, int(time_max.max(initial=0))), False)
+    for (env_index, env_time_max) in enumerate(time_max.tolist()):
+        timelines[env_index, :env_time_max] = measures_timeline(frequencies[env_index], offsets[env_index],
+                                                                env_time_max)
+
+    (rows, measures) = np.nonzero(timelines)
+    same_env = rows[1:] == rows[:-1]
+    gap_rows = rows[1:][same_env]
+    gaps = np.diff(measures)[same_env]
+    gaps_amount = np.bincount(gap_rows, minlength=envs_amount)
+    average_gap = np.bincount(gap_rows, weights=gaps, minlength=envs_amount) / np.maximum(gaps_amount, 1)
+    variance = np.bincount(gap_rows, weights=(gaps - average_gap[gap_rows]) ** 2, minlength=envs_amount)
+    return np.sqrt(variance)
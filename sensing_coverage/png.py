@@ -0,0 +1,36 @@
+import struct
+import zlib
+
+import numpy as np
+
+signature = b'\x89PNG\r\n\x1a\n'
+
+
+def encode_png(frame, compress_level=6):
+    """
+    Encodes RGB image as PNG file with zlib only, rows are stored without filtering.
+
+    :param frame: (height, width, 3) uint8 array
+    :param compress_level: zlib compression level, 1 is the fastest and 9 gives the smallest files
+    :return: bytes of PNG file
+    """
+    assert frame.ndim == 3 and frame.shape[2] == 3, 'RGB frame of shape (height, width, 3) is expected'
+    (height, width) = frame.shape[:2]
+    # each row starts with filter type byte, 0 means no filtering
+    rows = np.zeros((height, 1 + 3 * width), dtype=np.uint8)
+    rows[:, 1:] = frame.reshape(height, 3 * width)
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b''.join((signature, _chunk(b'IHDR', header), _chunk(b'IDAT', zlib.compress(rows.tobytes(), compress_level)),
+                     _chunk(b'IEND', b'')))
+
+
+def write_png(path, frame, compress_level=6):
+    """
+    Writes RGB image to PNG file, see encode_png
+    """
+    with open(path, 'wb') as file:
+        file.write(encode_png(frame, compress_level))
+
+
+def _chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
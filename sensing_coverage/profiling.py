@@ -0,0 +1,106 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class StepStats:
+    """
+    Timers and counters of SensingCoverageParallel steps. Each step is split into phases which durations are recorded
+    one after another with lap(), the latest max_samples durations of each phase are kept for percentiles, while
+    counts and total times are kept for the whole run. Caches registered with add_cache are asked for their hits and
+    misses when summary is made.
+
+
+    Attributes
+    ----------
+    max_samples(optional): number
+        amount of the latest durations of each phase used to calculate percentiles
+    counters: dict
+        name of a counter -> its value
+    """
+
+    def __init__(self, max_samples=10000):
+        self.max_samples = max_samples
+        self.samples = {}
+        self.calls = {}
+        self.totals = {}
+        self.counters = {}
+        self.caches = {}
+        self.started = None
+        self.last = None
+
+    def start(self):
+        """
+        Starts timing of a step and of its first phase
+        """
+        self.started = self.last = time.perf_counter()
+
+    def lap(self, phase):
+        """
+        Records time since start or since previous lap as a duration of given phase
+        """
+        now = time.perf_counter()
+        self.record(phase, now - self.last)
+        self.last = now
+
+    def stop(self):
+        """
+        Records time from start to the last lap as a duration of phase 'step'
+        """
+        self.record('step', self.last - self.started)
+
+    def record(self, phase, seconds):
+        if phase not in self.samples:
+            self.samples[phase] = deque(maxlen=self.max_samples)
+            self.calls[phase] = 0
+            self.totals[phase] = 0.0
+        self.samples[phase].append(seconds)
+        self.calls[phase] += 1
+        self.totals[phase] += seconds
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_cache(self, name, hits_and_misses):
+        """
+        :param hits_and_misses: callable returning a tuple (hits, misses) of a cache
+        """
+        self.caches[name] = hits_and_misses
+
+    def summary(self):
+        """
+        :return: dictionary with calls, total, mean, p50 and p99 time in seconds of each phase, counters and hits,
+        misses and hit rate of each cache
+        """
+        phases = {}
+        for (phase, samples) in self.samples.items():
+            (p50, p99) = np.percentile(np.fromiter(samples, dtype=np.float64), (50, 99)).tolist()
+            phases[phase] = {'calls': self.calls[phase], 'total_s': self.totals[phase],
+                             'mean_s': self.totals[phase] / self.calls[phase], 'p50_s': p50, 'p99_s': p99}
+        caches = {}
+        for (name, hits_and_misses) in self.caches.items():
+            (hits, misses) = hits_and_misses()
+            caches[name] = {'hits': hits, 'misses': misses,
+                            'hit_rate': hits / (hits + misses) if hits + misses > 0 else None}
+        return {'phases': phases, 'counters': dict(self.counters), 'caches': caches}
+
+    def dump(self, path=None):
+        """
+        :return: summary as JSON string, which is also written to given file if path is given
+        """
+        summary = json.dumps(self.summary(), indent=2)
+        if path is not None:
+            with open(path, 'w') as file:
+                file.write(summary)
+        return summary
+
+    def reset(self):
+        """
+        Forgets recorded durations and counters, registered caches are kept
+        """
+        self.samples.clear()
+        self.calls.clear()
+        self.totals.clear()
+        self.counters.clear()
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+def covered_cells(disks, width, length, tolerance=0.0):
+    """
+    Counts map positions (i, j) within distance radius from center of any disk with a quadtree over the map, built
+    level by level. A block of positions is fully covered if all its corners are within one disk, uncovered if no disk
+    reaches it and mixed otherwise. All blocks of a level are classified at once from pairs (block, disk reaching its
+    parent) and mixed blocks are split into four until they are single positions, which are never mixed. When half of
+    cells of mixed blocks fits into allowed error, these blocks are not split and counted as half covered, so larger
+    tolerance stops refining on higher levels.
+
+    :param disks: 2D float array of rows (center x, center y, radius)
+    :param width: width of the map
+    :param length: length of the map
+    :param tolerance: allowed error as a part of map area, 0 means exact count
+    :return: amount of covered positions, a float if it is an estimation
+    """
+    disks = np.asarray(disks, dtype=np.float64).reshape(-1, 3)
+    disks = disks[disks[:, 2] >= 0]
+    allowed_error = tolerance * width * length
+    counted = 0
+    estimated = 0.0
+    # blocks hold positions min_x..max_x - 1 x min_y..max_y - 1
+    (min_x, min_y, max_x, max_y) = (np.array([0]), np.array([0]), np.array([width]), np.array([length]))
+    (pair_blocks, pair_disks) = (np.zeros(len(disks), dtype=np.int64), np.arange(len(disks)))
+    while len(min_x) > 0 and len(pair_blocks) > 0:
+        (center_x, center_y, radius) = (disks[pair_disks, 0], disks[pair_disks, 1], disks[pair_disks, 2])
+        (from_x, from_y) = (min_x[pair_blocks], min_y[pair_blocks])
+        (last_x, last_y) = (max_x[pair_blocks] - 1, max_y[pair_blocks] - 1)
+        near_x = np.maximum(np.maximum(from_x - center_x, center_x - last_x), 0)
+        near_y = np.maximum(np.maximum(from_y - center_y, center_y - last_y), 0)
+        reaching = near_x ** 2 + near_y ** 2 <= radius ** 2
+        far_x = np.maximum(np.abs(center_x - from_x), np.abs(center_x - last_x))
+        far_y = np.maximum(np.abs(center_y - from_y), np.abs(center_y - last_y))
+        covering = far_x ** 2 + far_y ** 2 <= radius ** 2
+
+        cells = (max_x - min_x) * (max_y - min_y)
+        full = np.bincount(pair_blocks[covering], minlength=len(cells)) > 0
+        mixed = (np.bincount(pair_blocks[reaching], minlength=len(cells)) > 0) & ~full
+        counted += int(cells[full].sum())
+
+        # the smallest mixed blocks are left unsplit as long as their error fits into what is left of allowed error
+        order = np.flatnonzero(mixed)[np.argsort(cells[mixed], kind='stable')]
+        unsplit = order[np.cumsum(cells[order]) / 2 <= allowed_error]
+        estimated += int(cells[unsplit].sum()) / 2
+        allowed_error -= int(cells[unsplit].sum()) / 2
+        mixed[unsplit] = False
+
+        pairs = reaching & mixed[pair_blocks]
+        (children, pair_blocks, pair_disks) = _split(min_x, min_y, max_x, max_y, mixed, pair_blocks[pairs],
+                                                     pair_disks[pairs])
+        (min_x, min_y, max_x, max_y) = children
+    if estimated == 0:
+        return counted
+    return counted + estimated
+
+
+def _split(min_x, min_y, max_x, max_y, chosen, pair_blocks, pair_disks):
+    # splits chosen blocks into four children and assigns pairs of a block to each of its children
+    blocks = np.flatnonzero(chosen)
+    renumbered = np.full(len(chosen), -1)
+    renumbered[blocks] = np.arange(len(blocks))
+    pair_blocks = renumbered[pair_blocks]
+    (middle_x, middle_y) = ((min_x[blocks] + max_x[blocks]) // 2, (min_y[blocks] + max_y[blocks]) // 2)
+    children = ([], [], [], [])
+    (children_pair_blocks, children_pair_disks) = ([], [])
+    amount = 0
+    for (from_x, to_x) in ((min_x[blocks], middle_x), (middle_x, max_x[blocks])):
+        for (from_y, to_y) in ((min_y[blocks], middle_y), (middle_y, max_y[blocks])):
+            not_empty = (from_x < to_x) & (from_y < to_y)
+            numbers = np.full(len(blocks), -1)
+            numbers[not_empty] = amount + np.arange(np.count_nonzero(not_empty))
+            amount += np.count_nonzero(not_empty)
+            for (child, values) in zip(children, (from_x, from_y, to_x, to_y)):
+                child.append(values[not_empty])
+            kept = not_empty[pair_blocks]
+            children_pair_blocks.append(numbers[pair_blocks[kept]])
+            children_pair_disks.append(pair_disks[kept])
+    children = tuple(np.concatenate(child) for child in children)
+    return children, np.concatenate(children_pair_blocks), np.concatenate(children_pair_disks)
@@ -0,0 +1,143 @@
+import numpy as np
+
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+from sensing_coverage.sensor_registry import layout_columns, registry_columns
+from sensing_coverage.trajectory import state_columns
+
+# columns of sensors' state which are not changed by actions, their changes between steps (e.g. crashes) are copied
+# from the recording before actions of each step are applied
+external_columns = layout_columns
+
+
+class Replay:
+    """
+    Re-simulates a Trajectory recorded with initial configuration (see TrajectoryRecorder.start) from its actions.
+    Steps which are only passed on the way to a requested step apply actions to sensors' registry without computing
+    any coverage, observations or rewards, and state of sensors is checkpointed every checkpoint_interval steps, so
+    seeking to a step starts from the nearest checkpoint before it. Steps of interest are then simulated fully by
+    step(), which returns the same observations and rewards as the recorded run if the simulation is deterministic.
+    Recorded changes of sensors which are not caused by actions (e.g. crashes, with sensing_range of crashed sensors)
+    are applied before each step.
+
+
+    Attributes
+    ----------
+    trajectory: Trajectory
+        recording with actions and states of sensors of each step
+    checkpoint_interval(optional): number
+        amount of steps between checkpoints, each of them keeps a copy of state columns of all sensors
+    local_workers(optional): number
+        passed to SensingCoverageParallel used for fully simulated steps
+    env: SensingCoverageParallel
+        environment in array_output mode which state is the replayed state
+    position: number
+        amount of steps of the trajectory which were replayed
+    """
+
+    def __init__(self, trajectory, checkpoint_interval=1000, local_workers=None):
+        assert trajectory.initial is not None, 'trajectory was recorded without initial configuration'
+        assert checkpoint_interval > 0
+        self.trajectory = trajectory
+        self.checkpoint_interval = checkpoint_interval
+        initial = trajectory.initial
+        sensors = {}
+        for values in initial['sensors']:
+            # values are in order of registry_columns; they are written into sensor's registry row as they are, as
+            # ranges of sensors which crashed before recording don't pass the checks of Sensor constructor
+            sensor = Sensor(*values[:3])
+            for ((name, dtype), value) in zip(registry_columns, values):
+                getattr(sensor._registry, name)[sensor._row] = value
+            sensors[sensor.id] = sensor
+        self.env = SensingCoverageParallel(SensingEnvironment(sensors, **initial['environment']),
+                                           local_workers=local_workers, array_output=True, **initial['parallel'])
+        self.registry = self.env.env.registry
+        self.position = 0
+        # position -> state columns of sensors
+        self.checkpoints = {0: self.__state()}
+
+    def __len__(self):
+        return len(self.trajectory)
+
+    def seek(self, position):
+        """
+        Replays trajectory quickly until given amount of steps is replayed, starting from the nearest checkpoint if it
+        is closer than current position. Position 0 means state before the first step.
+        """
+        assert 0 <= position <= len(self.trajectory), f'position out of trajectory of {len(self.trajectory)} steps'
+        start = max(checkpoint for checkpoint in self.checkpoints if checkpoint <= position)
+        if not start <= self.position <= position:
+            self.__restore(self.checkpoints[start])
+            self.position = start
+        while self.position < position:
+            self.__apply_external()
+            actions = self.trajectory['actions'][self.position]
+            rows = np.arange(len(self.registry))
+            self.registry.adjust_sensing_range(rows, actions[:, 0])
+            self.registry.adjust_frequency(rows, actions[:, 1])
+            self.registry.adjust_offset(rows, actions[:, 2])
+            self.__advance()
+
+    def step(self):
+        """
+        Fully simulates the next step of trajectory.
+
+        :return: observations and rewards arrays of the step, like SensingCoverageParallel.step in array_output mode,
+        comparable with trajectory['observations'][position - 1] and trajectory['rewards'][position - 1]
+        """
+        assert self.position < len(self.trajectory), 'whole trajectory was replayed'
+        self.__apply_external()
+        (observations, rewards, dones, infos) = self.env.step(np.array(self.trajectory['actions'][self.position]))
+        self.__advance()
+        return observations, rewards
+
+    def run(self, start, stop=None):
+        """
+        Seeks to start and fully simulates steps from start to stop (end of trajectory by default).
+
+        :return: generator of tuples (step index, observations, rewards), arrays are overwritten by the next step
+        """
+        stop = len(self.trajectory) if stop is None else stop
+        self.seek(start)
+        for index in range(start, stop):
+            (observations, rewards) = self.step()
+            yield index, observations, rewards
+
+    def divergence(self):
+        """
+        :return: list of names of state columns which replayed values differ from the recorded values after the
+        last replayed step, empty list if state is the same
+        """
+        if self.position == 0:
+            return []
+        return [name for (name, dtype) in state_columns
+                if not np.array_equal(getattr(self.registry, name), self.trajectory[name][self.position - 1])]
+
+    def __advance(self):
+        self.position += 1
+        if self.position % self.checkpoint_interval == 0 and self.position not in self.checkpoints:
+            self.checkpoints[self.position] = self.__state()
+
+    def __apply_external(self):
+        registry = self.registry
+        # Sensor.crash also sets sensing_range to 0 and actions of crashed sensors are ignored, so range of sensors
+        # which crash before this step is taken from the recording as well
+        crashing = np.flatnonzero(~registry.crashed & self.trajectory['crashed'][self.position])
+        if len(crashing) > 0:
+            registry.sensing_range[crashing] = self.trajectory['sensing_range'][self.position][crashing]
+            registry.changed(crashing.tolist(), geometry=True)
+        for name in external_columns:
+            (column, recorded) = (getattr(registry, name), self.trajectory[name][self.position])
+            rows = np.flatnonzero(column != recorded)
+            if len(rows) > 0:
+                column[rows] = recorded[rows]
+                registry.changed(rows.tolist(), geometry=True, layout=True)
+
+    def __state(self):
+        return {name: getattr(self.registry, name).copy() for (name, dtype) in state_columns}
+
+    def __restore(self, state):
+        for (name, values) in state.items():
+            getattr(self.registry, name)[...] = values
+        self.registry.changed(list(range(len(self.registry))), geometry=True, layout=True)
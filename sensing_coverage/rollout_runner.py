@@ -0,0 +1,216 @@
+import multiprocessing
+import os
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from sensing_coverage.sensing_coverage import observation_columns
+
+
+class RolloutRunner:
+    """
+    Runs independent SensingCoverageParallel environments in a pool of worker processes. Each environment is created
+    by its factory inside a worker and it stays there, only actions, observations and rewards are exchanged through
+    NumPy arrays placed in shared memory, one block per environment, so nothing is pickled during steps. Workers are
+    told to step all their environments at once, step() waits for them while step_async() and step_wait() let the
+    caller do something else in the meantime.
+
+    Environments are switched to array_output mode in workers, so actions buffers are passed to their step() as they
+    are and returned arrays are copied into observations and rewards buffers. Sensors of an environment are taken in
+    order of env.get_sensors() when it was created.
+
+
+    Attributes
+    ----------
+    env_factories: list
+        picklable callables (e.g. module level functions or functools.partial of them) each returning a new
+        SensingCoverageParallel
+    processes(optional): number
+        amount of worker processes, by default amount of CPUs, never more than amount of environments
+    start_method(optional): str
+        multiprocessing start method, e.g. 'fork' or 'spawn', by default the platform's default
+    sensor_ids: list
+        for each environment 1D int array of its sensors' ids in order of rows of its buffers
+    actions: list
+        for each environment (sensors, 3) int array of (range diff, freq diff, offset diff) used by the next step
+    observations: list
+        for each environment (sensors, len(observation_columns)) float array filled by the last step
+    rewards: list
+        for each environment (sensors,) float array filled by the last step
+    """
+
+    def __init__(self, env_factories, processes=None, start_method=None):
+        assert len(env_factories) > 0
+        self.env_factories = list(env_factories)
+        self.processes = min(processes or os.cpu_count() or 1, len(self.env_factories))
+        context = multiprocessing.get_context(start_method)
+        # workers have to share parent's tracker of shared memory, otherwise their own trackers would remove the
+        # blocks when workers exit
+        resource_tracker.ensure_running()
+        # i-th environment is stepped by worker i % processes
+        self.assignment = [list(range(worker, len(self.env_factories), self.processes))
+                           for worker in range(self.processes)]
+        self.connections = []
+        self.workers = []
+        for envs in self.assignment:
+            (connection, worker_connection) = context.Pipe()
+            worker = context.Process(target=_work, args=(worker_connection, [self.env_factories[i] for i in envs]),
+                                     daemon=True)
+            worker.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.workers.append(worker)
+
+        self.sensor_ids = [None] * len(self.env_factories)
+        self.blocks = [None] * len(self.env_factories)
+        try:
+            for (envs, connection) in zip(self.assignment, self.connections):
+                for (env_index, ids) in zip(envs, _receive(connection)):
+                    self.sensor_ids[env_index] = np.array(ids, dtype=np.int64)
+                    self.blocks[env_index] = SharedMemory(create=True, size=_block_size(len(ids)))
+                connection.send([self.blocks[env_index].name for env_index in envs])
+        except BaseException:
+            # e.g. a factory failed in some worker
+            for worker in self.workers:
+                worker.terminate()
+            for block in self.blocks:
+                if block is not None:
+                    block.close()
+                    block.unlink()
+            raise
+        buffers = [_buffers(block, len(ids)) for (block, ids) in zip(self.blocks, self.sensor_ids)]
+        (self.actions, self.observations, self.rewards) = (list(buffer) for buffer in zip(*buffers))
+        self.waiting = False
+        self.closed = False
+
+    def __len__(self):
+        return len(self.env_factories)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def step_async(self, actions=None):
+        """
+        Starts a step of all environments and returns immediately.
+
+        :param actions: optional list with (sensors, 3) int array for each environment, it is copied into actions
+        buffers; if not given, values already written to actions buffers are used
+        """
+        assert not self.waiting, 'previous step was not finished with step_wait'
+        if actions is not None:
+            for (buffer, env_actions) in zip(self.actions, actions):
+                buffer[...] = env_actions
+        for connection in self.connections:
+            connection.send('step')
+        self.waiting = True
+
+    def step_wait(self):
+        """
+        Waits until the step started by step_async is finished.
+
+        :return: lists of observations and rewards arrays of each environment, they are views onto shared buffers,
+        so they are overwritten by the next step
+        :raises: the first error raised by a step of some environment, after all workers finished the step
+        """
+        assert self.waiting, 'step_async was not called'
+        self.waiting = False
+        _receive_all(self.connections)
+        return self.observations, self.rewards
+
+    def step(self, actions=None):
+        """
+        :return: the same as step_wait after step_async with given actions
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self.connections:
+            try:
+                if self.waiting:
+                    connection.recv()
+                connection.send('close')
+            except (BrokenPipeError, EOFError):
+                pass
+        for worker in self.workers:
+            worker.join()
+        self.actions = self.observations = self.rewards = None
+        for block in self.blocks:
+            block.unlink()
+            try:
+                block.close()
+            except BufferError:
+                # arrays returned by step_wait are still used by the caller, memory is freed when they are gone
+                pass
+
+
+def _block_size(sensors_amount):
+    # actions, observations and rewards of one environment, all of them have 8 bytes per value
+    return max(1, 8 * sensors_amount * (3 + len(observation_columns) + 1))
+
+
+def _buffers(block, sensors_amount):
+    actions = np.ndarray((sensors_amount, 3), dtype=np.int64, buffer=block.buf)
+    observations = np.ndarray((sensors_amount, len(observation_columns)), dtype=np.float64, buffer=block.buf,
+                              offset=actions.nbytes)
+    rewards = np.ndarray((sensors_amount,), dtype=np.float64, buffer=block.buf,
+                         offset=actions.nbytes + observations.nbytes)
+    return actions, observations, rewards
+
+
+def _receive(connection):
+    message = connection.recv()
+    if isinstance(message, BaseException):
+        raise message
+    return message
+
+
+def _receive_all(connections):
+    # every worker has to finish the step before an error is raised, otherwise its answer would be taken as the answer
+    # to the next step while it still writes to shared buffers
+    messages = [connection.recv() for connection in connections]
+    for message in messages:
+        if isinstance(message, BaseException):
+            raise message
+    return messages
+
+
+def _work(connection, env_factories):
+    (blocks, buffers) = ([], [])
+    try:
+        envs = [factory() for factory in env_factories]
+        for env in envs:
+            env.array_output = True
+        ids = [[sensor_id for (sensor_id, sensor) in env.env.get_sensors()] for env in envs]
+        connection.send(ids)
+        blocks = [SharedMemory(name=name) for name in connection.recv()]
+        buffers = [_buffers(block, len(env_ids)) for (block, env_ids) in zip(blocks, ids)]
+        while connection.recv() == 'step':
+            try:
+                for (env, env_buffers) in zip(envs, buffers):
+                    _step(env, *env_buffers)
+            except Exception as error:
+                connection.send(error)
+                continue
+            connection.send(None)
+    except Exception as error:
+        connection.send(error)
+    finally:
+        # views onto shared memory have to be released before it is closed
+        del buffers
+        for block in blocks:
+            block.close()
+        connection.close()
+
+
+def _step(env, actions, observations, rewards):
+    (env_observations, env_rewards, dones, infos) = env.step(actions)
+    observations[...] = env_observations
+    rewards[...] = env_rewards
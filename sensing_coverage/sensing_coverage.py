@@ -1,4 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import gym.spaces as spaces
+import numpy as np
 from pettingzoo.utils import ParallelEnv
 
 # actions are: sens (range diff, freq diff, offset diff) - tuple of 3 ints
@@ -6,30 +9,107 @@ from pettingzoo.utils import ParallelEnv
 # global: (all_coverage: float 0-1, freq_all, jitter),
 # local: (agent_coverage: float 0-1, other_agents_his_area_coverage: float 0-1, agent_freq, agent_offset)
 # )
-from sensing_coverage.sensing_render import SensingEnvRender
+from sensing_coverage.frame_render import render_frame
+from sensing_coverage.profiling import StepStats
+from sensing_coverage.stencil import disk_stencil
 
 encode_multiplier = 10
 
+# layout of columns of observations returned by step() in array_output mode (and of VectorSensingCoverage.step)
+observation_columns = ('coverage', 'freq', 'jitter', 'local_coverage', 'local_other_coverage', 'local_freq',
+                       'local_offset')
+
 
 class SensingCoverageParallel(ParallelEnv):
-    def __init__(self, env, max_sensing_range=5, max_freq=50, max_offset=50, alpha=0.4):
+    def __init__(self, env, max_sensing_range=5, max_freq=50, max_offset=50, alpha=0.4, local_workers=None,
+                 array_output=False, profile=False, recorder=None):
+        """
+        :param local_workers: if greater than 1 and backend computes local observations of many sensors at once (see
+        SensingEnvironment.get_local_coverage_kernel), chunks of sensors are computed in a pool of that many threads;
+        results are the same and in the same order as without it
+        :param array_output: if True, step() returns arrays instead of dictionaries, see step()
+        :param profile: if True, durations of phases of each step (actions, coverage, jitter, local_observations,
+        rewards) and cache hits are collected in stats
+        :param recorder: optional TrajectoryRecorder which records state of sensors, actions, observations and rewards
+        of each step, it is closed with the environment
+        """
         self.env = env
         self.max_sensing_range = max_sensing_range
         self.max_freq = max_freq
         self.alpha = alpha
         self.max_offset = max_offset
-        self.render_env = SensingEnvRender(env)
+        self.local_workers = local_workers
+        self.executor = None
+        self.array_output = array_output
+        self.observations = None
+        self.rewards = None
+        self.dones = None
+        self.recorder = recorder
+        self.stats = None
+        if profile:
+            self.stats = StepStats()
+            self.stats.add_cache('jitter', lambda: (env.jitter_cache.hits, env.jitter_cache.misses))
+            self.stats.add_cache('disk_stencil', lambda: tuple(disk_stencil.cache_info()[:2]))
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.recorder is not None:
+            self.recorder.close()
 
     def render(self, mode="accurate"):
+        """
+        :param mode: "accurate" or "human" show the map in a window until it is closed, "rgb_array" returns it as
+        an RGB array (see SensingEnvRender.render_array) without opening any window
+        """
+        if mode == "rgb_array":
+            return render_frame(self.env)
         if mode == "accurate":
-            self.render_env.render_accurate()
+            self.get_render_env().render_accurate()
         else:
-            self.render_env.render_human()
+            self.get_render_env().render_human()
 
     def get_render_env(self):
-        return self.render_env
+        """
+        :return: SensingEnvRender of env, pygame is imported when it is needed for the first time
+        """
+        return self.env.get_render_env()
+
+    def get_state(self, out=None):
+        """
+        :return: flat buffer with state of env, see SensingEnvironment.get_state
+        """
+        return self.env.get_state(out)
+
+    def set_state(self, state):
+        """
+        Restores state returned by get_state, so following steps give the same results as after it was taken
+        """
+        self.env.set_state(state)
 
     def step(self, actions):
+        """
+        :param actions: dictionary where key is sensor id and value is a tuple (range diff, freq diff, offset diff) or
+        None, or a (sensors, 3) int array of such diffs with rows in order of env.get_sensors(); the array is applied
+        to all sensors at once with the same rules as Sensor's adjust methods
+        :return: observations, rewards, dones and infos dictionaries keyed by sensor id. In array_output mode
+        observations are a (sensors, len(observation_columns)) float array with columns listed in observation_columns,
+        rewards a (sensors,) float array and dones a (sensors,) bool array, their rows follow order of
+        env.get_sensors() and infos is an empty dictionary. The arrays are reused and overwritten by the next step.
+        """
+        stats = self.stats
+        if stats is not None:
+            stats.start()
+        recorded_actions = None
+        if self.recorder is not None and self.recorder.initial is None:
+            self.recorder.start(self)
+        if isinstance(actions, np.ndarray):
+            self.__apply_actions_array(actions)
+            recorded_actions = actions
+            actions = {}
+        elif self.recorder is not None:
+            recorded_actions = self.__actions_array(actions)
         for sensor_id, actions in actions.items():
             if actions is not None:
                 (range_diff, freq_diff, offset_diff) = actions
@@ -37,19 +117,45 @@ class SensingCoverageParallel(ParallelEnv):
                 sensor.adjust_sensing_range(range_diff)
                 sensor.adjust__frequency(freq_diff)
                 sensor.adjust__offset(offset_diff)
+        if stats is not None:
+            stats.lap('actions')
+
+        all_coverage = self.env.get_covered_area() / self.env.get_area()
+        if stats is not None:
+            stats.lap('coverage')
+        all_freq = self.__sum_frequencies()
+        jitter = self.env.get_jitter()
+        if stats is not None:
+            stats.lap('jitter')
+        sensors = self.env.get_sensors()
+        local_coverages = self.__local_coverages(sensors)
+        if stats is not None:
+            stats.lap('local_observations')
+        if self.array_output:
+            result = self.__array_step(all_coverage, all_freq, jitter, local_coverages)
+        else:
+            result = self.__dict_step(sensors, all_coverage, all_freq, jitter, local_coverages)
+        if stats is not None:
+            stats.lap('rewards')
+        if self.recorder is not None:
+            if not self.array_output:
+                # arrays of observations and rewards are filled only for the recorder
+                self.__array_step(all_coverage, all_freq, jitter, local_coverages)
+            self.recorder.record(self.env.registry, recorded_actions, self.observations, self.rewards)
+            if stats is not None:
+                stats.lap('recording')
+        if stats is not None:
+            stats.stop()
+            stats.count('steps')
+            stats.count('sensor_steps', len(sensors))
+        return result
 
+    def __dict_step(self, sensors, all_coverage, all_freq, jitter, local_coverages):
         rewards = {}
         observations = {}
         dones = {}
         infos = {}
-        area = self.env.get_area()
-        all_coverage = self.env.get_covered_area() / area
-        all_freq = self.__sum_frequencies()
-        jitter = self.env.get_jitter()
-        for sensor_id, sensor in self.env.get_sensors():
-            operational_coverage = self.env.get_covered_area_for_sensor_operational_range(
-                sensor) / self.env.get_operational_max_for_sensor(sensor)
-            other_coverage = self.env.get_covered_by_other_sensors(sensor) / area
+        for (sensor_id, sensor), (operational_coverage, other_coverage) in zip(sensors, local_coverages.tolist()):
             observation = {
                 'global': {'coverage': all_coverage, 'freq': all_freq, 'jitter': jitter},
                 'local': {
@@ -69,6 +175,76 @@ class SensingCoverageParallel(ParallelEnv):
 
         return observations, rewards, dones, infos
 
+    def __apply_actions_array(self, actions):
+        registry = self.env.registry
+        assert actions.shape == (len(registry), 3), f'actions array of shape ({len(registry)}, 3) expected'
+        actions = actions.astype(np.int64, copy=False)
+        rows = np.arange(len(registry))
+        registry.adjust_sensing_range(rows, actions[:, 0])
+        registry.adjust_frequency(rows, actions[:, 1])
+        registry.adjust_offset(rows, actions[:, 2])
+
+    def __actions_array(self, actions):
+        """
+        :return: (sensors, 3) int array of given dictionary of actions, missing and None actions are zeros
+        """
+        array = np.zeros((len(self.env.registry), 3), dtype=np.int64)
+        for (sensor_id, sensor_actions) in actions.items():
+            if sensor_actions is not None:
+                array[self.env.get_sensor(sensor_id)._row] = sensor_actions
+        return array
+
+    def __array_step(self, all_coverage, all_freq, jitter, local_coverages):
+        registry = self.env.registry
+        sensors_amount = len(registry)
+        if self.observations is None or len(self.observations) != sensors_amount:
+            self.observations = np.empty((sensors_amount, len(observation_columns)))
+            self.rewards = np.empty(sensors_amount)
+            self.dones = np.full(sensors_amount, False)
+        observations = self.observations
+        observations[:, 0] = all_coverage
+        observations[:, 1] = all_freq
+        observations[:, 2] = jitter
+        observations[:, 3:5] = local_coverages
+        observations[:, 5] = registry.sens_frequency
+        observations[:, 6] = registry.sens_offset
+        # (1 - alpha) / sensing_range, sensing_range 0 counts as 1
+        np.divide(1 - self.alpha, np.maximum(registry.sensing_range, 1), out=self.rewards)
+        self.rewards += self.alpha * observations[:, 3]
+        self.rewards[registry.crashed] = 0
+        return observations, self.rewards, self.dones, {}
+
+    def __local_coverages(self, sensors):
+        """
+        :return: (sensors, 2) float array of local observations of given (sensor id, sensor) pairs of all sensors in
+        order of registry rows, see __local_coverage
+        """
+        kernel = self.env.get_local_coverage_kernel()
+        if kernel is None:
+            return np.array([self.__local_coverage(sensor) for (sensor_id, sensor) in sensors]).reshape(-1, 2)
+        sensors_amount = len(sensors)
+        if self.local_workers is None or self.local_workers <= 1 or sensors_amount < 2:
+            return kernel(0, sensors_amount)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.local_workers)
+        chunk_size = -(-sensors_amount // self.local_workers)
+        starts = range(0, sensors_amount, chunk_size)
+        # map keeps order of chunks, so rows are in the same order as without threads
+        chunks = self.executor.map(lambda start: kernel(start, min(start + chunk_size, sensors_amount)), starts)
+        return np.concatenate(list(chunks))
+
+    def __local_coverage(self, sensor):
+        """
+        :return: tuple (part of sensor's operational area which is covered, part of map covered by other sensors within
+        sensor's operational area)
+        """
+        operational_max = self.env.get_operational_max_for_sensor(sensor)
+        # with analytic backend operational disk of a crashed sensor has no area
+        operational_coverage = self.env.get_covered_area_for_sensor_operational_range(
+            sensor) / operational_max if operational_max > 0 else 0
+        other_coverage = self.env.get_covered_by_other_sensors(sensor) / self.env.get_area()
+        return operational_coverage, other_coverage
+
     def observation_space(self, agent):
         return spaces.Dict({
             'global': spaces.Dict(
@@ -99,7 +275,4 @@ class SensingCoverageParallel(ParallelEnv):
         return spaces.MultiDiscrete([self.max_sensing_range * 2, self.max_freq * 2, self.max_offset * 2])
 
     def __sum_frequencies(self):
-        sum_freq = 0
-        for sensor_id, sensor in self.env.get_sensors():
-            sum_freq += sensor.sens_frequency
-        return sum_freq
+        return int(self.env.registry.sens_frequency.sum())
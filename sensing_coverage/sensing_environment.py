@@ -1,8 +1,11 @@
-import math
-
 import numpy as np
 
-from sensing_coverage.sensing_render import SensingEnvRender
+from sensing_coverage.coverage_engine import coverage_backends
+from sensing_coverage.coverage_grid import CoverageGrid
+from sensing_coverage.jitter import JitterCache
+from sensing_coverage.sensor_registry import SensorRegistry
+from sensing_coverage.spatial_index import SpatialIndex
+from sensing_coverage.static_geometry import StaticGeometry
 
 
 class SensingEnvironment:
@@ -14,6 +17,10 @@ class SensingEnvironment:
     ----------
     sensors: dict
         dicitonary where key is id of sensor and value is Sensor itself
+    registry: SensorRegistry
+        columns with state of all sensors, sensors given in constructor become views onto its rows
+    geometry: StaticGeometry
+        operational windows, their cell counts and neighbors of sensors, updated only when sensors move or crash
     width(optional): number
         width of a sensing map rectangle
     length(optional): number
@@ -21,22 +28,68 @@ class SensingEnvironment:
     jitter_time_max: number
         when calculating jitter it is used to define how many units of time (e.g. seconds) are taken under
         consideration when creating a list of sensing measurements of each sensor
+    jitter_hyperperiod_max(optional): number
+        if given, jitter is calculated from one hyperperiod (least common multiple of sensors' frequencies) of measures
+        when hyperperiod is not longer than this value - it gives the same result faster for small sets of frequencies
+    jitter_cache_size(optional): number
+        how many jitter results for different sets of sensors' frequencies and offsets are kept in jitter_cache
+    backend(optional): str
+        name of coverage engine used to compute masks and covered cells, one of coverage_backends keys:
+        'numpy' (default) computes whole arrays at once, 'loop' is a slow pure Python reference, 'analytic' returns
+        exact areas of sensors' disks instead of amounts of covered cells, 'quadtree' counts covered cells of large maps
+        refining only blocks on edges of disks, 'sampling' estimates areas from coverage_samples low-discrepancy points
+    coverage_tolerance(optional): number
+        allowed error of covered area counted by 'quadtree' backend as a part of map area, 0 (default) means exact count
+    coverage_samples(optional): number
+        amount of sample points used by 'sampling' backend, the cost of its coverage queries depends on it
     """
 
-    def __init__(self, sensors, width=5, length=5, jitter_time_max=10000, debug=False):
+    def __init__(self, sensors, width=5, length=5, jitter_time_max=10000, backend='numpy',
+                 jitter_hyperperiod_max=None, jitter_cache_size=128, coverage_tolerance=0.0,
+                 coverage_samples=4096):
+        """
+        :param sensors: dictionary of sensor id -> Sensor. The environment takes ownership of given sensors: they
+        become views onto its registry, so changing them changes the environment. A sensor can belong to only one
+        environment at a time; passing it to another environment raises ValueError unless it was removed with
+        remove_sensor first, use new Sensor objects for each environment instead.
+        """
+        assert backend in coverage_backends, f'unknown coverage backend: {backend}'
         self.width = width
         self.length = length
         self.sensors = sensors
+        self.registry = SensorRegistry.from_sensors(sensors.values())
+        self.spatial_index = SpatialIndex(self.registry)
+        self.geometry = StaticGeometry(self)
         self.jitter_time_max = jitter_time_max
-        self.debug = debug
-        self.render_env = SensingEnvRender(self)
+        self.jitter_hyperperiod_max = jitter_hyperperiod_max
+        self.jitter_cache = JitterCache(jitter_cache_size)
+        self.backend = backend
+        self.coverage_tolerance = coverage_tolerance
+        self.coverage_samples = coverage_samples
+        self.engine = coverage_backends[backend](self)
+        self.coverage_grid = CoverageGrid(self)
+        for sensor in self.sensors.values():
+            sensor.add_listener(self.coverage_grid.invalidate)
+        # created on first drawing, so pygame is not imported by environments which are never drawn
+        self.render_env = None
 
 
-    def set_debug(self, debug):
-        self.debug=debug
+    def get_render_env(self):
+        """
+        :return: SensingEnvRender of this environment, rendering modules and pygame are imported on the first call
+        """
+        if self.render_env is None:
+            from sensing_coverage.sensing_render import SensingEnvRender
+            self.render_env = SensingEnvRender(self)
+        return self.render_env
 
-    def has_debug(self):
-        return self.debug
+    def draw_map(self, covered_area=None):
+        """
+        Shows given 2D bool array of covered positions (current coverage by default) in a window until it is closed
+        """
+        if covered_area is None:
+            covered_area = self.get_sensing_coverage_area()
+        self.get_render_env().draw_map(covered_area)
 
     def get_area(self):
         return self.width * self.length
@@ -53,8 +106,70 @@ class SensingEnvironment:
     def get_sensor(self, id):
         return self.sensors[id]
 
+    def get_neighbors(self, sensor, radius=None):
+        """
+        :return: list of sensors which sensing area can intersect area within given radius (by default
+        operational_range) from given sensor, including the sensor itself
+        """
+        return [self.registry.sensors[row] for row in self.get_neighbor_rows(sensor, radius).tolist()]
+
+    def get_neighbor_rows(self, sensor, radius=None):
+        """
+        :return: 1D int array of registry rows of sensors returned by get_neighbors, in ascending order
+        """
+        if radius is None and self.geometry.owns(sensor):
+            # static neighbors are the sensors which could reach operational disk with their max_sensing_range
+            rows = self.geometry.refresh().neighbors[sensor._row]
+            reach = sensor.operational_range + self.registry.sensing_range[rows]
+            distance = (self.registry.x[rows] - sensor.x) ** 2 + (self.registry.y[rows] - sensor.y) ** 2
+            return rows[distance <= reach ** 2]
+        if radius is None:
+            radius = sensor.operational_range
+        return self.spatial_index.query(sensor.x, sensor.y, radius)
+
+    def get_state(self, out=None):
+        """
+        Snapshot of all mutable values of sensors and of the coverage grid (if it was built), e.g. for planning which
+        explores many branches from the same state. Use set_state to go back to it.
+
+        :param out: optional buffer returned by previous get_state of this environment, it is overwritten instead of
+        allocating a new one
+        :return: 1D uint8 array with amount of sensors and presence of grid, values of registry's mutable columns and
+        refreshed grid one after another
+        """
+        grid = self.coverage_grid
+        grid_nbytes = 0
+        if grid.valid:
+            grid.refresh()
+            grid_nbytes = grid.state_nbytes()
+        registry_nbytes = self.registry.state_nbytes()
+        size = 16 + registry_nbytes + grid_nbytes
+        if out is None or len(out) != size:
+            out = np.empty(size, dtype=np.uint8)
+        out[:16].view(np.int64)[...] = (len(self.registry), grid_nbytes > 0)
+        self.registry.save_state(out[16:16 + registry_nbytes])
+        if grid_nbytes > 0:
+            grid.save_state(out[16 + registry_nbytes:])
+        return out
+
+    def set_state(self, state):
+        """
+        Restores values saved by get_state in place, sensors can't be removed in the meantime
+        """
+        (sensors_amount, has_grid) = state[:16].view(np.int64)
+        assert sensors_amount == len(self.registry), 'state was saved with different amount of sensors'
+        registry_nbytes = self.registry.state_nbytes()
+        self.registry.load_state(state[16:16 + registry_nbytes])
+        if has_grid:
+            self.coverage_grid.load_state(state[16 + registry_nbytes:])
+        else:
+            self.coverage_grid.invalidate()
+
     def remove_sensor(self, sensor):
-        self.sensors.pop(sensor.id)
+        removed = self.sensors.pop(sensor.id)
+        self.registry.remove(removed._row)
+        removed.remove_listener(self.coverage_grid.invalidate)
+        self.coverage_grid.invalidate(removed)
 
     def get_operational_for_sensor_area(self, sensor):
         return self.__get_sensing_area(sensor, sensor.operational_range)
@@ -66,14 +181,26 @@ class SensingEnvironment:
         return self.__get_sensing_area(sensor, sensor.sensing_range)
 
 
+    def get_operational_for_sensor_window(self, sensor):
+        """
+        :returns WindowMask of positions within operational_range of given sensor
+        """
+        return self.engine.sensing_window(sensor, sensor.operational_range)
+
+    def get_coverage_for_sensor_window(self, sensor):
+        """
+        :returns WindowMask of positions covered by given sensor, its memory depends on sensor's range, not map size
+        """
+        return self.engine.sensing_window(sensor, sensor.sensing_range)
+
+    def get_coverage_for_sensor_operational_range_window(self, sensor):
+        """
+        :returns WindowMask version of get_coverage_for_sensor_operational_range_area
+        """
+        return self.engine.operational_coverage_window(sensor, include_sensor=True)
+
     def __get_sensing_area(self, sensor, range):
-        (xx, yy) = np.ogrid[:self.width, :self.length]
-        dist_from_center = np.sqrt((xx - sensor.x) ** 2 + (yy - sensor.y) ** 2)
-        covered_area = dist_from_center <= range
-        if self.debug:
-            print(f'get_coverage_for_sensor_area: sensor:{sensor.details()}')
-            self.render_env.draw_map(covered_area)
-        return covered_area
+        return self.engine.sensing_area(sensor, range)
 
     def get_coverage_for_sensor_operational_range_area(self, sensor):
         """
@@ -92,124 +219,56 @@ class SensingEnvironment:
         :return: 2D bool array where True means all map position covered by all sensors excluding sensor which is
         served as parameter
         """
-        sensor_to_skip_id = None
-        if sensor_to_skip is not None:
-            sensor_to_skip_id = sensor_to_skip.id
-
-        covered_area = np.full((self.width, self.length), False)
-        for sensor in self.sensors.values():
-            if sensor.id != sensor_to_skip_id:
-                area = self.get_coverage_for_sensor_area(sensor)
-                for ind_x, row in enumerate(area):
-                    for ind_y, y in enumerate(row):
-                        if y:
-                            covered_area[(ind_x, ind_y)] = True
-        if self.debug:
-            if sensor_to_skip is not None:
-                print(f'get_coverage_excluding_sensor: sensor:{sensor_to_skip.details()}')
-            else:
-                print('get_coverage_excluding_sensor')
-            self.render_env.draw_map(covered_area)
-        return covered_area
+        return self.engine.coverage_area(sensor_to_skip)
 
 
     def __check_coverage_in_operational_area(self, sensor, include_sensor):
-        operational_range = sensor.operational_range
-        (xx, yy) = np.ogrid[:self.width, :self.length]
-        dist_from_center = np.sqrt((xx - sensor.x) ** 2 + (yy - sensor.y) ** 2)
-        operational_area = dist_from_center <= operational_range
-
-        result = np.full((self.width, self.length), False)
-        if include_sensor:
-            sensor_to_skip = None
-        else:
-            sensor_to_skip = sensor
-        for ind_x, row in enumerate(self.get_coverage_excluding_sensor_area(sensor_to_skip)):
-            for ind_y, y in enumerate(row):
-                if y and operational_area[ind_x, ind_y]:
-                    result[ind_x, ind_y] = True
-        if self.debug:
-            print(f'__check_coverage_in_operational_area: sensor:{sensor.details()}, include_sensor:{include_sensor}')
-            self.render_env.draw_map(result)
-        return result
-
-    def __check_coverage_by_other_sensors_area(self, sensor):
-        """
-        :return: 2d bool array where True means position covered by other sensors limited to operational_range
-         of given sensor
-        """
-        return self.__check_coverage_in_operational_area(sensor, include_sensor=False)
-
+        return self.engine.operational_coverage_area(sensor, include_sensor)
 
     def get_jitter(self):
         """
-        :return: calculates a jitter using standard deviation. First we create a bool array of False values called
-        measures. Then we iterate over each sensor and calculate timestamps using sensor's sens_offset and
-        sens_frequency - we fill measures array with True in places where timestamp occur.
-        In next step we iterate over measures array to check gaps between each measure.
-        Next we calculate avreage_gap by dividing sum of gaps and their amount. At last we iterate over each gap
-        and to calculate standard deviation where average is average_gap and x_i is measured gap.
-        """
-        sensors_measures_occurences = set()  # we don't need duplicates
-        for sensor_id, sensor in self.get_sensors():
-            tmp_measure = sensor.sens_offset
-            while tmp_measure < self.jitter_time_max:
-                sensors_measures_occurences.add(tmp_measure)
-                tmp_measure += sensor.sens_frequency
-        sensors_measures_occurences = list(sensors_measures_occurences)
-        sensors_measures_occurences.sort()
-
-        prev_measure_occurrence = sensors_measures_occurences[0]
-        gaps_amount = 0
-        measures_gap_sum = 0
-        measures_gaps = []
-        for measure_occurrence in sensors_measures_occurences[1:]:
-            gaps_amount += 1
-            gap = measure_occurrence - prev_measure_occurrence
-            measures_gap_sum += gap
-            measures_gaps.append(gap)
-            prev_measure_occurrence = measure_occurrence
-
-        average_gap = measures_gap_sum / gaps_amount
-        variance = 0
-        for gap in measures_gaps:
-            variance += ((gap - average_gap) ** 2)
-        return math.sqrt(variance)
+        :return: calculates a jitter using standard deviation. Timestamps of measures of each sensor are calculated
+        using sensor's sens_offset and sens_frequency and marked on a bool timeline of jitter_time_max units, a sensor
+        with sens_frequency 0 measures only once. Then gaps between consecutive measures are taken with np.diff and
+        jitter is the square root of sum of squared differences between each gap and average gap (0 if there are less
+        than two measures). With jitter_hyperperiod_max set, only one hyperperiod of measures is marked if it is short
+        enough. Results are cached in jitter_cache by sensors' frequencies and offsets.
+        """
+        return self.jitter_cache.jitter(self.registry.sens_frequency, self.registry.sens_offset, self.jitter_time_max,
+                                        self.jitter_hyperperiod_max)
 
     def get_covered_by_other_sensors(self, sensor):
         """
         :return: a scalar number which indicates how many points on map are covered by other senors within given
         sensor's check range
         """
-        return self.__get_covered_to_scalar(self.__check_coverage_by_other_sensors_area(sensor))
+        return self.engine.covered_in_operational_range(sensor, include_sensor=False)
 
     def get_covered_area(self):
         """
         :return: a scalar number which indicates how many points on map are covered by all sensors
         """
-        coverage = self.get_sensing_coverage_area()
-        return self.__get_covered_to_scalar(coverage)
+        return self.engine.covered_area()
 
     def get_covered_area_for_sensor(self, sensor):
         """
         :return: a scalar number which indicates how many points on map are covered by given sensor
         """
-        return self.__get_covered_to_scalar(self.get_coverage_for_sensor_area(sensor))
+        return self.engine.sensor_covered_area(sensor)
 
     def get_covered_area_for_sensor_operational_range(self, sensor):
         if sensor.crashed:
             return 0
         else:
-            return self.__get_covered_to_scalar(self.get_coverage_for_sensor_operational_range_area(sensor))
+            return self.engine.covered_in_operational_range(sensor, include_sensor=True)
 
 
     def get_operational_max_for_sensor(self, sensor):
-        return self.__get_covered_to_scalar(self.get_operational_for_sensor_area(sensor))
-
-    def __get_covered_to_scalar(self, arr):
-        covered_fields = 0
-        for x in arr:
-            for y in x:
-                if y:
-                    covered_fields += 1
-        return covered_fields
+        return self.engine.operational_max(sensor)
+
+    def get_local_coverage_kernel(self):
+        """
+        :return: function of (start, stop) computing local observations of registry rows from start to stop at once,
+        see CoverageEngine.local_coverage_kernel; None if backend doesn't have it
+        """
+        return self.engine.local_coverage_kernel()
@@ -2,12 +2,15 @@ import pygame
 import pygame.freetype
 from pygame import Color, Rect
 
-rect_color = Color(169, 169, 169)
-sensor_color = Color(0, 255, 0)
-operational_color = Color(255, 0, 0)
-cover_color = Color(0, 0, 255)
-bg_color = Color(255, 255, 255)
-black_color = Color(0, 0, 0)
+from sensing_coverage import frame_render
+from sensing_coverage.frame_render import frame_scale, rasterize, render_frame
+
+rect_color = Color(*frame_render.map_color)
+sensor_color = Color(*frame_render.sensor_color)
+operational_color = Color(*frame_render.operational_color)
+cover_color = Color(*frame_render.cover_color)
+bg_color = Color(*frame_render.bg_color)
+black_color = Color(*frame_render.line_color)
 scale = 30
 
 class SensingEnvRender():
@@ -20,9 +23,6 @@ class SensingEnvRender():
         screen = pygame.display.set_mode([1024, 960])
         font = pygame.freetype.SysFont('Arial', 11)
 
-        has_debug = self.env.has_debug()
-        self.env.set_debug(False)
-
         self.__draw_rect(screen)
         for id, sensor in self.env.get_sensors():
             self.__draw_sensor_range(sensor, screen)
@@ -36,8 +36,6 @@ class SensingEnvRender():
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
-        if has_debug:
-            self.env.set_debug(True)
         pygame.quit()
 
     def __draw_rect(self, screen):
@@ -63,29 +61,11 @@ class SensingEnvRender():
         pygame.init()
         screen = pygame.display.set_mode([1024, 960])
         font = pygame.freetype.SysFont('Arial', 11)
-        has_debug = self.env.has_debug()
-        self.env.set_debug(False)
-
-        self.__draw_rect(screen)
-
-        for sensor_id, sensor in self.env.get_sensors():
-            covered_area = self.env.get_coverage_for_sensor_area(sensor)
-            for ind_x, row in enumerate(covered_area):
-                for ind_y, x in enumerate(row):
-                    if x:
-                        self.__draw_sensor_range_accurate(screen, ind_x, ind_y)
-
-        for sensor_id, sensor in self.env.get_sensors():
-            covered_area = self.env.get_operational_for_sensor_area(sensor)
-            for ind_x, row in enumerate(covered_area):
-                for ind_y, x in enumerate(row):
-                    if x:
-                        self.__draw_sensor_operational_range_accurate(screen, ind_x, ind_y)
 
+        screen.fill(bg_color)
+        self.__blit_frame(screen, render_frame(self.env, scale))
         for sensor_id, sensor in self.env.get_sensors():
-            self.__draw_sensor_accurate(sensor, screen, font)
-
-        self.__draw_lines(screen, self.env.get_width(), self.env.get_length())
+            self.__draw_sensor_label(sensor, screen, font)
         pygame.display.flip()
         running = True
 
@@ -94,12 +74,21 @@ class SensingEnvRender():
                 if event.type == pygame.QUIT:
                     running = False
 
-        if has_debug:
-            self.env.set_debug(True)
         pygame.quit()
 
-    def __draw_sensor_range_accurate(self,screen, ind_x, ind_y):
-        pygame.draw.rect(screen, cover_color, Rect(ind_x * scale, ind_y * scale, scale, scale))
+    def render_array(self, scale=frame_scale):
+        """
+        Draws the same picture as render_accurate (without sensors' labels) without opening any window, so it never
+        blocks and works on machines without a display.
+
+        :param scale: size in pixels of one map cell
+        :return: (length * scale, width * scale, 3) uint8 RGB array
+        """
+        return render_frame(self.env, scale)
+
+    def __blit_frame(self, screen, frame):
+        # surfarray is indexed by (x, y), frames by (y, x)
+        screen.blit(pygame.surfarray.make_surface(frame.swapaxes(0, 1)), (0, 0))
 
     def __draw_sensor_operational_range(self, sensor, screen):
         x = sensor.x * scale + scale/2
@@ -107,27 +96,16 @@ class SensingEnvRender():
         pygame.draw.circle(surface=screen, color=operational_color, center=(x, y),
                            radius=scale * sensor.operational_range, width=5)
 
-    def __draw_sensor_accurate(self, sensor, screen, font):
+    def __draw_sensor_label(self, sensor, screen, font):
         x = sensor.x * scale + scale/2
         y = sensor.y * scale + scale/2
-        pygame.draw.circle(surface=screen, color=sensor_color, center=(x, y),
-                           radius=scale/2)
         font.render_to(screen, (x - scale/2, y), sensor.__str__())
 
-
-    def __draw_sensor_operational_range_accurate(self,screen, ind_x, ind_y):
-        pygame.draw.rect(screen, operational_color, Rect(ind_x * scale, ind_y * scale, scale, scale), width=2)
-
     def draw_map(self, covered_area):
         pygame.init()
         screen = pygame.display.set_mode([1024, 960])
-        self.__draw_rect(screen)
-        for ind_x, row in enumerate(covered_area):
-            for ind_y, x in enumerate(row):
-                if x:
-                    self.__draw_sensor_range_accurate(screen, ind_x, ind_y)
-
-        self.__draw_lines(screen, self.env.get_width(), self.env.get_length())
+        screen.fill(bg_color)
+        self.__blit_frame(screen, rasterize(covered_area, scale=scale))
         pygame.display.flip()
         running = True
 
@@ -1,3 +1,27 @@
+from sensing_coverage.sensor_registry import SensorRegistry
+
+
+def registry_field(name, geometry=False, number=False, layout=False):
+    """
+    :return: property reading and writing given column of sensor's row in its SensorRegistry. Changing a geometry field
+    changes the area covered by sensor, so it is announced to sensor's listeners. Changing a layout field changes
+    sensor's static geometry (see StaticGeometry). Number fields are stored as floats, but whole numbers are returned
+    as ints.
+    """
+
+    def get(self):
+        value = getattr(self._registry, name).item(self._row)
+        if number and value.is_integer():
+            return int(value)
+        return value
+
+    def set(self, value):
+        getattr(self._registry, name)[self._row] = value
+        self._registry.changed(self._row, geometry, layout)
+
+    return property(get, set)
+
+
 class Sensor:
     """
     A class which represents single sensor.
@@ -24,21 +48,46 @@ class Sensor:
         it says how much time after sensor started first sensing occurs (e.g. 10 seconds after start)
     """
 
+    __slots__ = ('_registry', '_row', '_listeners')
+
     def __init__(self, id, x, y, sensing_range=0, max_sensing_range=5, operational_range=6, sens_frequency=30,
                  sens_offset=0):
         assert operational_range >= max_sensing_range
-        self.crashed = False
-        self.id = id
-        self.x = x
-        self.y = y
-        self.max_sensing_range = max_sensing_range
+        self._listeners = ()
         if sensing_range > max_sensing_range:
-            self.sensing_range = max_sensing_range
-        else:
-            self.sensing_range = sensing_range
-        self.sens_frequency = sens_frequency
-        self.sens_offset = sens_offset
-        self.operational_range = operational_range
+            sensing_range = max_sensing_range
+        SensorRegistry([(id, x, y, sensing_range, max_sensing_range, operational_range, sens_frequency, sens_offset,
+                         False)], [self])
+
+    id = registry_field('id')
+    x = registry_field('x', geometry=True, number=True, layout=True)
+    y = registry_field('y', geometry=True, number=True, layout=True)
+    sensing_range = registry_field('sensing_range', geometry=True)
+    max_sensing_range = registry_field('max_sensing_range', layout=True)
+    operational_range = registry_field('operational_range', geometry=True, layout=True)
+    sens_frequency = registry_field('sens_frequency')
+    sens_offset = registry_field('sens_offset')
+    crashed = registry_field('crashed', geometry=True, layout=True)
+
+    def values(self):
+        """
+        :return: tuple with values of sensor's fields in order of registry_columns
+        """
+        return self._registry.row_values(self._row)
+
+    def notify(self):
+        for listener in self._listeners:
+            listener(self)
+
+    def add_listener(self, listener):
+        """
+        Registers a callable which is called with sensor as argument each time sensor's position, range or crash state
+        changes
+        """
+        self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener):
+        self._listeners = tuple(registered for registered in self._listeners if registered != listener)
 
     def __str__(self):
         return f'{self.id}:({self.x},{self.y})'
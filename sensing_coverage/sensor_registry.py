@@ -0,0 +1,184 @@
+import numpy as np
+
+# name and dtype of each column of SensorRegistry
+registry_columns = (
+    ('id', np.int64),
+    ('x', np.float64),
+    ('y', np.float64),
+    ('sensing_range', np.int64),
+    ('max_sensing_range', np.int64),
+    ('operational_range', np.int64),
+    ('sens_frequency', np.int64),
+    ('sens_offset', np.int64),
+    ('crashed', bool),
+)
+
+# columns which values can change, saved by SensorRegistry.save_state
+mutable_columns = tuple((name, dtype) for (name, dtype) in registry_columns if name != 'id')
+# columns which changes have to increment layout_version
+layout_columns = ('x', 'y', 'max_sensing_range', 'operational_range', 'crashed')
+
+
+class SensorRegistry:
+    """
+    A structure of arrays holding state of many sensors in contiguous NumPy columns, one row per sensor. Sensor objects
+    are only views onto rows of a registry, so state of all sensors of an environment can be read and changed in bulk.
+
+
+    Attributes
+    ----------
+    id, x, y, sensing_range, max_sensing_range, operational_range, sens_frequency, sens_offset, crashed: 1D arrays
+        columns with values of Sensor attributes of the same names, i-th value belongs to i-th row
+    sensors: list
+        Sensor views, i-th of them is bound to i-th row
+    version: number
+        incremented on each change of any value, so it can be used to find out whether registry changed
+    layout_version: number
+        incremented only on changes of sensors' positions, operational or max sensing ranges, crash state and on
+        removal of rows
+    owned: bool
+        True for registries of SensingEnvironment created by from_sensors, their sensors can't be bound to another
+        registry by from_sensors
+    """
+
+    def __init__(self, rows=None, sensors=None):
+        """
+        :param rows: list of tuples with values of each column (in order of registry_columns) for each row
+        :param sensors: Sensor views which should be bound to rows
+        """
+        rows = rows or []
+        for (index, (name, dtype)) in enumerate(registry_columns):
+            setattr(self, name, np.array([row[index] for row in rows], dtype=dtype))
+        self.sensors = []
+        self.version = 0
+        self.layout_version = 0
+        self.owned = False
+        for (row, sensor) in enumerate(sensors or []):
+            self.bind(sensor, row)
+
+    @classmethod
+    def from_sensors(cls, sensors):
+        """
+        :return: new owned registry with values of given sensors copied into its columns and sensors bound to its rows
+        :raises ValueError: if any of given sensors is bound to another owned registry, i.e. it belongs to another
+        environment, which state would silently stop following the sensor
+        """
+        sensors = list(sensors)
+        for sensor in sensors:
+            if sensor._registry.owned:
+                raise ValueError(f'sensor {sensor.id} already belongs to another environment, create a new Sensor '
+                                 f'or remove it from the other environment first')
+        registry = cls([sensor.values() for sensor in sensors], sensors)
+        registry.owned = True
+        return registry
+
+    def __len__(self):
+        return len(self.id)
+
+    def bind(self, sensor, row):
+        sensor._registry = self
+        sensor._row = row
+        if row == len(self.sensors):
+            self.sensors.append(sensor)
+        else:
+            self.sensors[row] = sensor
+
+    def row_values(self, row):
+        """
+        :return: tuple with values of given row in order of registry_columns
+        """
+        return tuple(getattr(self, name).item(row) for (name, dtype) in registry_columns)
+
+    def remove(self, row):
+        """
+        Removes given row, rows after it are moved one position back, so the order of sensors is kept. Removed sensor
+        is bound to a new registry of its own, so it can be still used.
+        """
+        removed = self.sensors.pop(row)
+        SensorRegistry([self.row_values(row)], [removed])
+        for (name, dtype) in registry_columns:
+            setattr(self, name, np.delete(getattr(self, name), row))
+        for index in range(row, len(self.sensors)):
+            self.sensors[index]._row = index
+        self.version += 1
+        self.layout_version += 1
+
+    def changed(self, rows, geometry, layout=False):
+        """
+        Announces that values of given rows changed, if geometry is True listeners of sensors are notified as well, if
+        layout is True layout_version is incremented
+        """
+        self.version += 1
+        if layout:
+            self.layout_version += 1
+        if not geometry:
+            return
+        if isinstance(rows, int):
+            self.sensors[rows].notify()
+        else:
+            for row in rows:
+                self.sensors[row].notify()
+
+    def state_nbytes(self):
+        """
+        :return: size in bytes of buffer used by save_state and load_state
+        """
+        return len(self) * sum(np.dtype(dtype).itemsize for (name, dtype) in mutable_columns)
+
+    def save_state(self, buffer):
+        """
+        Copies values of all mutable columns one after another into given 1D uint8 array of size state_nbytes()
+        """
+        offset = 0
+        for (name, dtype) in mutable_columns:
+            column = getattr(self, name)
+            buffer[offset:offset + column.nbytes].view(dtype)[...] = column
+            offset += column.nbytes
+
+    def load_state(self, buffer):
+        """
+        Copies values of mutable columns saved by save_state back into columns without notifying sensors' listeners.
+        version is incremented, layout_version only if any of layout_columns changed.
+        """
+        offset = 0
+        layout = False
+        for (name, dtype) in mutable_columns:
+            column = getattr(self, name)
+            values = buffer[offset:offset + column.nbytes].view(dtype)
+            if name in layout_columns and not layout:
+                layout = not np.array_equal(column, values)
+            column[...] = values
+            offset += column.nbytes
+        self.changed([], geometry=False, layout=layout)
+
+    def adjust_sensing_range(self, rows, diffs):
+        """
+        Vectorized Sensor.adjust_sensing_range of many sensors
+        """
+        new_ranges = self.sensing_range[rows] + diffs
+        allowed = ~self.crashed[rows] & (0 <= new_ranges)
+        new_ranges = np.minimum(new_ranges, self.max_sensing_range[rows])
+        self.__set_changed(self.sensing_range, rows, new_ranges, allowed, geometry=True)
+
+    def adjust_frequency(self, rows, diffs):
+        """
+        Vectorized Sensor.adjust__frequency of many sensors
+        """
+        new_frequencies = self.sens_frequency[rows] + diffs
+        allowed = ~self.crashed[rows] & (0 <= new_frequencies)
+        self.__set_changed(self.sens_frequency, rows, new_frequencies, allowed, geometry=False)
+
+    def adjust_offset(self, rows, diffs):
+        """
+        Vectorized Sensor.adjust__offset of many sensors
+        """
+        new_offsets = self.sens_offset[rows] + diffs
+        allowed = ~self.crashed[rows] & (0 <= new_offsets)
+        self.__set_changed(self.sens_offset, rows, new_offsets, allowed, geometry=False)
+
+    def __set_changed(self, column, rows, values, allowed, geometry):
+        rows = np.arange(len(self))[rows]
+        changed = allowed & (column[rows] != values)
+        if np.any(changed):
+            column[rows[changed]] = values[changed]
+            self.changed(rows[changed], geometry)
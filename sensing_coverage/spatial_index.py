@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+
+
+class SpatialIndex:
+    """
+    Uniform grid of buckets holding rows of SensorRegistry by sensors' positions. It answers which sensors' sensing
+    disks can intersect a given disk by looking only into buckets around it. Buckets are rebuilt lazily when positions
+    of sensors change.
+
+
+    Attributes
+    ----------
+    registry: SensorRegistry
+        registry which sensors are indexed
+    cell_size(optional): number
+        side of a bucket, by default twice the largest max_sensing_range of sensors
+    """
+
+    def __init__(self, registry, cell_size=None):
+        self.registry = registry
+        self.cell_size = cell_size
+        self.buckets = {}
+        self.bucket_size = 1
+        self.reach = 0
+        self.version = None
+        self.x = None
+        self.y = None
+
+    def refresh(self):
+        """
+        :return: the index itself, rebuilt if positions of sensors changed since last refresh
+        """
+        registry = self.registry
+        if self.version == registry.version:
+            return self
+        self.version = registry.version
+        self.reach = int(max(registry.max_sensing_range.max(initial=0), registry.sensing_range.max(initial=0)))
+        if not (np.array_equal(self.x, registry.x) and np.array_equal(self.y, registry.y)):
+            self.__rebuild()
+        return self
+
+    def __rebuild(self):
+        registry = self.registry
+        self.x = registry.x.copy()
+        self.y = registry.y.copy()
+        self.bucket_size = self.cell_size or max(1, 2 * int(registry.max_sensing_range.max(initial=0)))
+        bucket_x = np.floor(self.x / self.bucket_size).astype(np.int64)
+        bucket_y = np.floor(self.y / self.bucket_size).astype(np.int64)
+        order = np.lexsort((bucket_y, bucket_x))
+        keys = np.stack((bucket_x[order], bucket_y[order]), axis=1)
+        (unique_keys, starts) = np.unique(keys, axis=0, return_index=True)
+        self.buckets = {(int(key_x), int(key_y)): rows
+                        for ((key_x, key_y), rows) in zip(unique_keys, np.split(order, starts[1:]))}
+
+    def query(self, x, y, radius):
+        """
+        :return: 1D int array of registry rows of sensors which sensing disk intersects disk of given radius centered
+        at (x, y), in ascending order
+        """
+        self.refresh()
+        search = radius + self.reach
+        (min_x, max_x) = (math.floor((x - search) / self.bucket_size), math.floor((x + search) / self.bucket_size))
+        (min_y, max_y) = (math.floor((y - search) / self.bucket_size), math.floor((y + search) / self.bucket_size))
+        if (max_x - min_x + 1) * (max_y - min_y + 1) > len(self.buckets):
+            found = [rows for ((key_x, key_y), rows) in self.buckets.items()
+                     if min_x <= key_x <= max_x and min_y <= key_y <= max_y]
+        else:
+            found = [self.buckets[key] for key in
+                     ((key_x, key_y) for key_x in range(min_x, max_x + 1) for key_y in range(min_y, max_y + 1))
+                     if key in self.buckets]
+        if not found:
+            return np.array([], dtype=np.int64)
+        rows = np.sort(np.concatenate(found))
+        reach = radius + self.registry.sensing_range[rows]
+        distance = (self.registry.x[rows] - x) ** 2 + (self.registry.y[rows] - y) ** 2
+        return rows[distance <= reach ** 2]
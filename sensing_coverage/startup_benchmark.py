@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Measures how long a fresh worker process takes to import the simulator, create an environment and make one step,
+# which is paid by every worker of RolloutRunner with 'spawn' start method. The same is measured with pygame imported
+# up front, like before the renderer was loaded lazily, to show its cost. Run from repository root, e.g.:
+# python -m sensing_coverage.startup_benchmark --repeats 20 --output startup.json
+worker_code = '''
+import sys, time
+start = time.perf_counter()
+if {preload_pygame}:
+    import pygame, pygame.freetype
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+imported = time.perf_counter()
+sensors = {{sensor_id: Sensor(sensor_id, sensor_id % 20, sensor_id // 20) for sensor_id in range(100)}}
+SensingCoverageParallel(SensingEnvironment(sensors, width=20, length=20)).step({{}})
+print(imported - start, time.perf_counter() - imported, 'pygame' in sys.modules)
+'''
+
+
+def measure_worker(preload_pygame):
+    """
+    :return: tuple (process s, import s, first step s, pygame loaded) of one fresh Python process, process time
+    includes interpreter startup
+    """
+    environment = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', worker_code.format(preload_pygame=preload_pygame)],
+                            capture_output=True, text=True, check=True, env=environment).stdout
+    process_time = time.perf_counter() - start
+    (import_time, step_time, pygame_loaded) = output.split()
+    return process_time, float(import_time), float(step_time), pygame_loaded == 'True'
+
+
+def benchmark_case(preload_pygame, repeats):
+    """
+    :return: dictionary with average process, import and first step times of given amount of fresh processes
+    """
+    measurements = [measure_worker(preload_pygame) for _ in range(repeats)]
+    (process_times, import_times, step_times, pygame_loaded) = zip(*measurements)
+    return {
+        'preload_pygame': preload_pygame, 'repeats': repeats, 'pygame_loaded': any(pygame_loaded),
+        'process_s': sum(process_times) / repeats,
+        'import_s': sum(import_times) / repeats,
+        'first_step_s': sum(step_times) / repeats,
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark of startup of sensing coverage worker processes')
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--output', help='path of JSON file with results, printed to stdout if not given')
+    args = parser.parse_args(args)
+    results = []
+    for preload_pygame in (False, True):
+        result = benchmark_case(preload_pygame, args.repeats)
+        print(f"preload_pygame={preload_pygame}: process {result['process_s'] * 1000:.1f}ms, "
+              f"import {result['import_s'] * 1000:.1f}ms, pygame loaded: {result['pygame_loaded']}", file=sys.stderr)
+        results.append(result)
+    report = {'python': platform.python_version(), 'platform': platform.platform(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import math
+
+import numpy as np
+
+from sensing_coverage.stencil import disk_window
+
+
+class StaticGeometry:
+    """
+    Per-sensor geometry of SensingEnvironment which changes only when sensors move, crash or are removed: window of
+    operational disk, amount of its cells and rows of sensors which can cover any part of it. It is computed for all
+    sensors at once and rebuilt only when registry's layout_version changes, so during steps these values are plain
+    lookups by registry row.
+
+
+    Attributes
+    ----------
+    env: SensingEnvironment
+        environment which sensors are described
+    operational_windows: list
+        for each registry row (slices, stencil) window of sensor's operational disk as returned by stencil.disk_window
+    operational_cells: 1D int array
+        for each registry row amount of map cells within sensor's operational_range
+    neighbors: list
+        for each registry row 1D int array of rows of sensors which disk of max_sensing_range intersects sensor's
+        operational disk, in ascending order
+    operational_starts: 1D int array
+        cells of operational disks of all sensors are kept one row after another in flat arrays, cells of row i are
+        between operational_starts[i] and operational_starts[i + 1]
+    operational_positions: 1D int array
+        flat map position (x * length + y) of each cell of operational disks, cells of each row are ordered by distance
+        from sensor, so cells within its sensing_range come first
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.version = None
+        self.operational_windows = []
+        self.operational_cells = np.zeros(0, dtype=np.int64)
+        self.neighbors = []
+        self.operational_starts = np.zeros(1, dtype=np.int64)
+        self.operational_positions = np.zeros(0, dtype=np.int64)
+        # for each row sorted squared distances of cells of its operational disk and amounts of them within radius
+        self.row_distances = []
+        self.own_cells_table = np.zeros((0, 1), dtype=np.int64)
+        self.refresh()
+
+    def refresh(self):
+        """
+        :return: geometry itself, rebuilt if layout of sensors changed since last refresh
+        """
+        registry = self.env.registry
+        if self.version != registry.layout_version:
+            self.version = registry.layout_version
+            self.__rebuild()
+        return self
+
+    def owns(self, sensor):
+        """
+        :return: True if given sensor is a view onto env's registry, only such sensors are described
+        """
+        return sensor._registry is self.env.registry
+
+    def own_cells(self, sensing_range):
+        """
+        :param sensing_range: sensing_range column of registry
+        :return: 1D int array with amount of cells of each row's operational disk which are within its sensing_range
+        """
+        if int(sensing_range.max(initial=0)) >= self.own_cells_table.shape[1]:
+            self.__count_own_cells(int(sensing_range.max()))
+        return self.own_cells_table[np.arange(len(sensing_range)), sensing_range]
+
+    def operational_counts(self, counts, own_cells, start, stop):
+        """
+        Counts covered cells of operational disks of registry rows from start to stop with a few whole-array operations
+        on their flat cells. It only reads arrays, so it can be called for different rows from many threads at once.
+
+        :param counts: flattened CoverageGrid.counts
+        :param own_cells: array returned by own_cells for current sensing ranges
+        :return: tuple of 1D int arrays (covered cells, cells covered by other sensors) of operational disk of each row
+        """
+        (begin, end) = (self.operational_starts[start], self.operational_starts[stop])
+        cell_counts = np.take(counts, self.operational_positions[begin:end])
+        bounds = self.operational_starts[start:stop + 1] - begin
+        own_bounds = np.empty(2 * len(bounds) - 1, dtype=np.int64)
+        own_bounds[0::2] = bounds
+        own_bounds[1::2] = bounds[:-1] + own_cells[start:stop]
+        covered = _segment_counts(cell_counts > 0, bounds)
+        # cells within sensing_range covered only once are covered only by the sensor itself
+        covered_by_own_only = _segment_counts(cell_counts == 1, own_bounds)[0::2]
+        return covered, covered - covered_by_own_only
+
+    def __rebuild(self):
+        (env, registry) = (self.env, self.env.registry)
+        positions = zip(registry.x.tolist(), registry.y.tolist(), registry.operational_range.tolist())
+        self.operational_windows = [disk_window(x, y, operational_range, env.width, env.length)
+                                    for (x, y, operational_range) in positions]
+        self.operational_cells = np.array([0 if window is None else np.count_nonzero(window[1])
+                                           for window in self.operational_windows], dtype=np.int64)
+        self.__flatten_operational_windows()
+        reach = int(registry.max_sensing_range.max(initial=0))
+        self.neighbors = []
+        for row in range(len(registry)):
+            (x, y, operational_range) = (registry.x[row], registry.y[row], registry.operational_range[row])
+            # spatial index returns a superset, as its reach is at least max_sensing_range of every sensor
+            rows = env.spatial_index.query(x, y, operational_range + reach)
+            distance = (registry.x[rows] - x) ** 2 + (registry.y[rows] - y) ** 2
+            self.neighbors.append(rows[distance <= (operational_range + registry.max_sensing_range[rows]) ** 2])
+
+    def __flatten_operational_windows(self):
+        (env, registry) = (self.env, self.env.registry)
+        (positions, self.row_distances) = ([], [])
+        for (x, y, window) in zip(registry.x.tolist(), registry.y.tolist(), self.operational_windows):
+            if window is None:
+                self.row_distances.append(np.zeros(0))
+                continue
+            ((slices_x, slices_y), stencil) = window
+            (cells_x, cells_y) = np.nonzero(stencil)
+            cells_x += slices_x.start
+            cells_y += slices_y.start
+            # the same arithmetic as in stencil.disk_stencil, so cells within sensing_range are the cells of its disk
+            (ind_x, ind_y) = (math.floor(x), math.floor(y))
+            distances = ((cells_x - ind_x) - (x - ind_x)) ** 2 + ((cells_y - ind_y) - (y - ind_y)) ** 2
+            order = np.argsort(distances, kind='stable')
+            positions.append(cells_x[order] * env.length + cells_y[order])
+            self.row_distances.append(distances[order])
+        self.operational_starts = np.concatenate(([0], np.cumsum(self.operational_cells)))
+        self.operational_positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+        self.__count_own_cells(int(registry.max_sensing_range.max(initial=0)))
+
+    def __count_own_cells(self, radius_max):
+        squared_radiuses = np.arange(radius_max + 1) ** 2
+        self.own_cells_table = np.zeros((len(self.row_distances), radius_max + 1), dtype=np.int64)
+        for (row, distances) in enumerate(self.row_distances):
+            self.own_cells_table[row] = np.searchsorted(distances, squared_radiuses, side='right')
+
+
+def _segment_counts(flags, bounds):
+    """
+    :param flags: 1D bool array
+    :param bounds: nondecreasing indices of flags from 0 to len(flags)
+    :return: 1D int array with amount of True flags between each two consecutive bounds
+    """
+    counts = np.zeros(len(bounds) - 1, dtype=np.int32)
+    nonempty = bounds[:-1] < bounds[1:]
+    if np.any(nonempty):
+        # empty segments are skipped, so each segment ends where the next listed one starts
+        counts[nonempty] = np.add.reduceat(flags, bounds[:-1][nonempty], dtype=np.int32)
+    return counts
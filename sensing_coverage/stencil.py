@@ -0,0 +1,114 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+# amount of distinct (radius, sub-cell offset) stencils kept in memory, least recently used ones are dropped first
+max_cached_stencils = 512
+
+
+@lru_cache(maxsize=max_cached_stencils)
+def disk_stencil(radius, offset_x=0, offset_y=0):
+    """
+    Rasterizes a disk once for given radius and sub-cell offset of its center, later calls with the same arguments
+    return the same cached array.
+
+    :return: tuple (stencil, half) where stencil is a read only 2D bool array of size 2 * half + 1 and True means
+    positions within radius from point (half + offset_x, half + offset_y)
+    """
+    half = math.floor(radius)
+    if offset_x or offset_y:
+        half += 1
+    (xx, yy) = np.ogrid[-half:half + 1, -half:half + 1]
+    stencil = (xx - offset_x) ** 2 + (yy - offset_y) ** 2 <= radius ** 2
+    stencil.setflags(write=False)
+    return stencil, half
+
+
+@lru_cache(maxsize=max_cached_stencils)
+def ring_stencil(radius_from, radius_to, offset_x=0, offset_y=0):
+    """
+    Difference between disks of two radiuses with the same center, used to update coverage counts when only sensor's
+    range changes.
+
+    :return: tuple (stencil, half) where stencil is a read only 2D int8 array of the larger disk's size, 1 means
+    position gained, -1 position lost and 0 position unchanged when radius changes from radius_from to radius_to
+    """
+    (disk_from, half_from) = disk_stencil(radius_from, offset_x, offset_y)
+    (disk_to, half_to) = disk_stencil(radius_to, offset_x, offset_y)
+    half = max(half_from, half_to)
+    stencil = np.zeros((2 * half + 1, 2 * half + 1), dtype=np.int8)
+    stencil[half - half_to:half + half_to + 1, half - half_to:half + half_to + 1] += disk_to
+    stencil[half - half_from:half + half_from + 1, half - half_from:half + half_from + 1] -= disk_from
+    stencil.setflags(write=False)
+    return stencil, half
+
+
+def disk_window(x, y, radius, width, length):
+    """
+    Places a cached stencil of a disk centered at (x, y) on width x length map clipping it at map borders.
+
+    :return: tuple (slices, stencil) where slices is a pair of slices selecting part of the map under the stencil and
+    stencil is a read only 2D bool array of the same shape; None if the disk lies outside of the map
+    """
+    ind_x = math.floor(x)
+    ind_y = math.floor(y)
+    (stencil, half) = disk_stencil(radius, x - ind_x, y - ind_y)
+    return place_stencil(stencil, half, ind_x, ind_y, width, length)
+
+
+def ring_window(x, y, radius_from, radius_to, width, length):
+    """
+    Places a cached ring_stencil centered at (x, y) on width x length map clipping it at map borders.
+
+    :return: tuple (slices, stencil) like disk_window, but stencil is a 2D int8 array of differences
+    """
+    ind_x = math.floor(x)
+    ind_y = math.floor(y)
+    (stencil, half) = ring_stencil(radius_from, radius_to, x - ind_x, y - ind_y)
+    return place_stencil(stencil, half, ind_x, ind_y, width, length)
+
+
+def place_stencil(stencil, half, ind_x, ind_y, width, length):
+    """
+    :return: tuple (slices, stencil) of given stencil centered at map position (ind_x, ind_y) and clipped at borders
+    of width x length map; None if nothing of it lies on the map
+    """
+    start_x = ind_x - half
+    start_y = ind_y - half
+    min_x = max(start_x, 0)
+    min_y = max(start_y, 0)
+    max_x = min(start_x + stencil.shape[0], width)
+    max_y = min(start_y + stencil.shape[1], length)
+    if min_x >= max_x or min_y >= max_y:
+        return None
+    return ((slice(min_x, max_x), slice(min_y, max_y)),
+            stencil[min_x - start_x:max_x - start_x, min_y - start_y:max_y - start_y])
+
+
+def paste_disk(target, x, y, radius, value=True):
+    """
+    Sets given value in target 2D array at positions within radius from (x, y)
+    """
+    window = disk_window(x, y, radius, target.shape[0], target.shape[1])
+    if window is not None:
+        (slices, stencil) = window
+        target[slices][stencil] = value
+    return target
+
+
+def window_overlap(outer, inner):
+    """
+    :return: pair of slices tuples selecting common part of two map windows, first relative to outer window and
+    second relative to inner window; None if windows don't overlap
+    """
+    outer_part = []
+    inner_part = []
+    for (outer_slice, inner_slice) in zip(outer, inner):
+        start = max(outer_slice.start, inner_slice.start)
+        stop = min(outer_slice.stop, inner_slice.stop)
+        if start >= stop:
+            return None
+        outer_part.append(slice(start - outer_slice.start, stop - outer_slice.start))
+        inner_part.append(slice(start - inner_slice.start, stop - inner_slice.start))
+    return tuple(outer_part), tuple(inner_part)
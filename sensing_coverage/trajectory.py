@@ -0,0 +1,193 @@
+import json
+import os
+
+import numpy as np
+
+from sensing_coverage.sensing_coverage import observation_columns
+from sensing_coverage.sensor_registry import mutable_columns
+
+# name of the file with description of recorded fields in trajectory directory
+meta_file = 'trajectory.json'
+
+# columns of SensorRegistry recorded after each step, ids are stored once in meta_file
+state_columns = mutable_columns
+
+
+class TrajectoryRecorder:
+    """
+    Records SensingCoverageParallel steps into a directory in columnar format: each field (every column of sensors'
+    state after the step, actions, observations and rewards) has its own raw binary file of consecutive steps, which
+    is described in meta_file. Steps are first copied into preallocated chunks of chunk_steps steps and whole chunks
+    are appended to files, so memory use does not grow with amount of steps. Recorded files are opened with Trajectory,
+    which maps them into memory instead of reading them.
+
+    Amount and order of sensors have to stay the same during recording, rows follow order of env.get_sensors().
+
+
+    Attributes
+    ----------
+    directory: str
+        directory of recorded files, created if it does not exist, files of previous recording are replaced
+    chunk_steps(optional): number
+        amount of steps kept in memory before they are written to files
+    steps: number
+        amount of recorded steps, including those not yet written
+    initial: dict
+        configuration of environment and state of its sensors before the first step, set by start; None if it was not
+        called, such recording can't be replayed
+    """
+
+    def __init__(self, directory, chunk_steps=1024):
+        assert chunk_steps > 0
+        self.directory = directory
+        self.chunk_steps = chunk_steps
+        self.steps = 0
+        self.initial = None
+        self.sensor_ids = None
+        self.chunks = None
+        self.buffered = 0
+        self.closed = False
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self, parallel_env):
+        """
+        Remembers parameters of given SensingCoverageParallel and of its SensingEnvironment and current values of all
+        its sensors, so recorded steps can be replayed from the beginning by Replay. It is called by
+        SensingCoverageParallel before its first recorded step.
+        """
+        env = parallel_env.env
+        self.initial = {
+            'environment': {
+                'width': env.width, 'length': env.length, 'jitter_time_max': env.jitter_time_max,
+                'backend': env.backend, 'jitter_hyperperiod_max': env.jitter_hyperperiod_max,
+                'jitter_cache_size': env.jitter_cache.max_size, 'coverage_tolerance': env.coverage_tolerance,
+                'coverage_samples': env.coverage_samples,
+            },
+            'parallel': {
+                'max_sensing_range': parallel_env.max_sensing_range, 'max_freq': parallel_env.max_freq,
+                'max_offset': parallel_env.max_offset, 'alpha': parallel_env.alpha,
+            },
+            'sensors': [env.registry.row_values(row) for row in range(len(env.registry))],
+        }
+
+    def record(self, registry, actions, observations, rewards):
+        """
+        Adds one step.
+
+        :param registry: SensorRegistry of environment after the step
+        :param actions: (sensors, 3) int array of actions of the step
+        :param observations: (sensors, len(observation_columns)) float array returned by the step
+        :param rewards: (sensors,) float array returned by the step
+        """
+        assert not self.closed, 'recorder is closed'
+        if self.chunks is None:
+            self.__start(registry)
+        assert len(registry) == len(self.sensor_ids), 'amount of sensors changed during recording'
+        index = self.buffered
+        for (name, dtype) in state_columns:
+            self.chunks[name][index] = getattr(registry, name)
+        self.chunks['actions'][index] = actions
+        self.chunks['observations'][index] = observations
+        self.chunks['rewards'][index] = rewards
+        self.buffered += 1
+        self.steps += 1
+        if self.buffered == self.chunk_steps:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends buffered steps to files and updates meta_file, so all recorded steps can be opened with Trajectory
+        """
+        if self.chunks is None:
+            return
+        for (name, chunk) in self.chunks.items():
+            with open(self.__path(name), 'ab') as file:
+                file.write(chunk[:self.buffered].tobytes())
+        self.buffered = 0
+        fields = {name: {'dtype': chunk.dtype.str, 'shape': list(chunk.shape[2:])}
+                  for (name, chunk) in self.chunks.items()}
+        meta = {'steps': self.steps, 'sensor_ids': self.sensor_ids, 'observation_columns': list(observation_columns),
+                'initial': self.initial, 'fields': fields}
+        # meta is replaced at once, so a reader never sees it half written
+        with open(self.__path(meta_file) + '.tmp', 'w') as file:
+            json.dump(meta, file, indent=2)
+        os.replace(self.__path(meta_file) + '.tmp', self.__path(meta_file))
+
+    def close(self):
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+    def __start(self, registry):
+        self.sensor_ids = registry.id.tolist()
+        sensors_amount = len(self.sensor_ids)
+        self.chunks = {name: np.zeros((self.chunk_steps, sensors_amount), dtype=dtype)
+                       for (name, dtype) in state_columns}
+        self.chunks['actions'] = np.zeros((self.chunk_steps, sensors_amount, 3), dtype=np.int64)
+        self.chunks['observations'] = np.zeros((self.chunk_steps, sensors_amount, len(observation_columns)))
+        self.chunks['rewards'] = np.zeros((self.chunk_steps, sensors_amount))
+        for name in self.chunks:
+            open(self.__path(name), 'wb').close()
+
+    def __path(self, name):
+        if name == meta_file:
+            return os.path.join(self.directory, name)
+        return os.path.join(self.directory, name + '.bin')
+
+
+class Trajectory:
+    """
+    Read only view of steps recorded by TrajectoryRecorder. Fields are NumPy memmaps, so opening even a very long
+    recording is immediate and only the parts which are used are read from disk.
+
+
+    Attributes
+    ----------
+    directory: str
+        directory of recorded files
+    steps: number
+        amount of recorded steps
+    sensor_ids: list
+        ids of sensors in order of rows of fields
+    fields: dict
+        name of field -> memmap of shape (steps, sensors, ...), e.g. trajectory.fields['rewards'][step, row]; names are
+        names of SensorRegistry columns (without 'id'), 'actions', 'observations' and 'rewards'
+    initial: dict
+        configuration recorded by TrajectoryRecorder.start or None
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, meta_file)) as file:
+            meta = json.load(file)
+        self.steps = meta['steps']
+        self.sensor_ids = meta['sensor_ids']
+        self.observation_columns = tuple(meta['observation_columns'])
+        self.initial = meta.get('initial')
+        self.fields = {}
+        for (name, field) in meta['fields'].items():
+            shape = (self.steps, len(self.sensor_ids), *field['shape'])
+            if self.steps == 0:
+                # empty files can't be mapped
+                self.fields[name] = np.zeros(shape, dtype=field['dtype'])
+            else:
+                self.fields[name] = np.memmap(os.path.join(directory, name + '.bin'), dtype=field['dtype'], mode='r',
+                                              shape=shape)
+
+    def __len__(self):
+        return self.steps
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def observation(self, column):
+        """
+        :return: (steps, sensors) view of given column of observations, e.g. 'local_coverage'
+        """
+        return self.fields['observations'][:, :, self.observation_columns.index(column)]
@@ -0,0 +1,197 @@
+import numpy as np
+
+from sensing_coverage.jitter import batch_jitter
+from sensing_coverage.sensing_coverage import observation_columns
+from sensing_coverage.stencil import disk_window, ring_window, window_overlap
+
+
+class VectorSensingCoverage:
+    """
+    A batch of independent sensing coverage simulations stepped at once. State of all environments is held in stacked
+    NumPy arrays, so one step() call applies actions, computes coverage, observations and rewards of every environment
+    with whole-array operations. Rules of each simulation are the same as in SensingCoverageParallel.
+
+    All environments must have the same map size and the same amount of sensors, their sensors are taken in order of
+    rows of environment's SensorRegistry.
+
+
+    Attributes
+    ----------
+    envs: list
+        SensingEnvironment objects which initial state is copied into the batch, they are not modified by step()
+    alpha(optional): number or 1D array
+        reward weight of operational coverage, a separate value can be given for each environment
+    x, y, sensing_range, max_sensing_range, operational_range, sens_frequency, sens_offset, crashed: 2D arrays
+        (environments, sensors) arrays with state of every sensor of every environment
+    counts: 3D int array
+        (environments, width, length) amount of sensors covering each cell, updated only around sensors which
+        sensing_range changed
+    """
+
+    def __init__(self, envs, alpha=0.4):
+        assert len(envs) > 0
+        self.width = envs[0].get_width()
+        self.length = envs[0].get_length()
+        registries = [env.registry for env in envs]
+        for env in envs:
+            assert env.get_width() == self.width and env.get_length() == self.length
+            assert len(env.registry) == len(registries[0])
+        self.batch_size = len(envs)
+        self.sensors_amount = len(registries[0])
+        self.alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), (self.batch_size,)).copy()
+        self.jitter_time_max = np.array([env.jitter_time_max for env in envs], dtype=np.int64)
+        self.sensor_ids = self.__column(registries, 'id', np.int64)
+        self.x = self.__column(registries, 'x', np.float64)
+        self.y = self.__column(registries, 'y', np.float64)
+        self.sensing_range = self.__column(registries, 'sensing_range', np.int64)
+        self.max_sensing_range = self.__column(registries, 'max_sensing_range', np.int64)
+        self.operational_range = self.__column(registries, 'operational_range', np.int64)
+        self.sens_frequency = self.__column(registries, 'sens_frequency', np.int64)
+        self.sens_offset = self.__column(registries, 'sens_offset', np.int64)
+        self.crashed = self.__column(registries, 'crashed', bool)
+        self.counts = np.zeros((self.batch_size, self.width, self.length), dtype=np.int32)
+        all_envs = np.arange(self.batch_size)
+        for sensor_index in range(self.sensors_amount):
+            for envs in self.__groups(all_envs, sensor_index, self.sensing_range):
+                window = disk_window(*self.__disk(envs[0], sensor_index, self.sensing_range))
+                if window is not None:
+                    (slices, stencil) = window
+                    self.counts[(envs, *slices)] += stencil
+        # sensing_range of each sensor which is included in counts
+        self.applied_range = self.sensing_range.copy()
+        self.jitter = np.zeros(self.batch_size)
+        self.__jitter_stale = np.full(self.batch_size, True)
+
+    @classmethod
+    def from_env(cls, env, batch_size, **kwargs):
+        """
+        :return: VectorSensingCoverage made of batch_size copies of given SensingEnvironment
+        """
+        return cls([env] * batch_size, **kwargs)
+
+    @staticmethod
+    def __column(registries, name, dtype):
+        return np.stack([getattr(registry, name) for registry in registries]).astype(dtype)
+
+    def get_area(self):
+        return self.width * self.length
+
+    def crash(self, env_index, sensor_index):
+        """
+        Crashes sensor of given position in given environment, same as Sensor.crash()
+        """
+        self.sensing_range[env_index, sensor_index] = 0
+        self.operational_range[env_index, sensor_index] = 0
+        self.crashed[env_index, sensor_index] = True
+
+    def apply_actions(self, actions):
+        """
+        :param actions: 3D int array of shape (environments, sensors, 3) with (range diff, freq diff, offset diff) of
+        each sensor, changes are applied with the same rules as Sensor.adjust_* methods
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        assert actions.shape == (self.batch_size, self.sensors_amount, 3)
+        working = ~self.crashed
+
+        new_range = self.sensing_range + actions[:, :, 0]
+        self.sensing_range[:] = np.where(working & (0 <= new_range), np.minimum(new_range, self.max_sensing_range),
+                                         self.sensing_range)
+
+        new_freq = self.sens_frequency + actions[:, :, 1]
+        new_offset = self.sens_offset + actions[:, :, 2]
+        freq_changed = working & (0 <= new_freq) & (new_freq != self.sens_frequency)
+        offset_changed = working & (0 <= new_offset) & (new_offset != self.sens_offset)
+        self.sens_frequency[:] = np.where(freq_changed, new_freq, self.sens_frequency)
+        self.sens_offset[:] = np.where(offset_changed, new_offset, self.sens_offset)
+        self.__jitter_stale |= np.any(freq_changed | offset_changed, axis=1)
+
+    def step(self, actions):
+        """
+        :return: tuple (observations, rewards, dones, infos) where observations is a 3D float array of shape
+        (environments, sensors, len(observation_columns)), rewards is a 2D float array of shape (environments, sensors),
+        dones is a 2D bool array of the same shape and infos is an empty dict
+        """
+        self.apply_actions(actions)
+        self.__update_counts()
+        self.__update_jitter()
+
+        area = self.get_area()
+        observations = np.empty((self.batch_size, self.sensors_amount, len(observation_columns)))
+        observations[:, :, 0] = (np.count_nonzero(self.counts, axis=(1, 2)) / area)[:, None]
+        observations[:, :, 1] = self.sens_frequency.sum(axis=1)[:, None]
+        observations[:, :, 2] = self.jitter[:, None]
+        all_envs = np.arange(self.batch_size)
+        for sensor_index in range(self.sensors_amount):
+            operational_max = np.zeros(self.batch_size, dtype=np.int64)
+            operational_covered = np.zeros(self.batch_size, dtype=np.int64)
+            other_covered = np.zeros(self.batch_size, dtype=np.int64)
+            for envs in self.__groups(all_envs, sensor_index, self.operational_range, self.sensing_range):
+                operational = disk_window(*self.__disk(envs[0], sensor_index, self.operational_range))
+                if operational is None:
+                    continue
+                (slices, stencil) = operational
+                counts = self.counts[:, slices[0], slices[1]][envs]
+                operational_max[envs] = np.count_nonzero(stencil)
+                operational_covered[envs] = np.count_nonzero((counts > 0) & stencil, axis=(1, 2))
+                own = disk_window(*self.__disk(envs[0], sensor_index, self.sensing_range))
+                overlap = None if own is None else window_overlap(slices, own[0])
+                if overlap is not None:
+                    (operational_part, own_part) = overlap
+                    counts[(slice(None), *operational_part)] -= own[1][own_part]
+                other_covered[envs] = np.count_nonzero((counts > 0) & stencil, axis=(1, 2))
+            operational_covered[self.crashed[:, sensor_index]] = 0
+            observations[:, sensor_index, 3] = np.divide(operational_covered, operational_max,
+                                                         out=np.zeros(self.batch_size), where=operational_max > 0)
+            observations[:, sensor_index, 4] = other_covered / area
+        observations[:, :, 5] = self.sens_frequency
+        observations[:, :, 6] = self.sens_offset
+
+        alpha = self.alpha[:, None]
+        range_cost = np.divide(1.0, self.sensing_range, out=np.ones(self.sensing_range.shape),
+                               where=self.sensing_range > 0)
+        rewards = alpha * observations[:, :, 3] + (1 - alpha) * range_cost
+        rewards[self.crashed] = 0
+        dones = np.full((self.batch_size, self.sensors_amount), False)
+        return observations, rewards, dones, {}
+
+    def __groups(self, envs, sensor_index, *columns):
+        """
+        :return: generator of 1D arrays of given environments' indices, grouped so that sensor of given index has the
+        same position and the same values of given (environments, sensors) columns in all environments of a group
+        """
+        keys = np.stack([self.x[envs, sensor_index], self.y[envs, sensor_index],
+                         *(column[envs, sensor_index] for column in columns)], axis=1)
+        (unique, inverse) = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        for group in range(len(unique)):
+            yield envs[inverse == group]
+
+    def __disk(self, env_index, sensor_index, radius_column):
+        """
+        :return: arguments of stencil.disk_window for a disk of sensor with radius from given column
+        """
+        return (float(self.x[env_index, sensor_index]), float(self.y[env_index, sensor_index]),
+                int(radius_column[env_index, sensor_index]), self.width, self.length)
+
+    def __update_counts(self):
+        for sensor_index in range(self.sensors_amount):
+            changed = np.flatnonzero(self.applied_range[:, sensor_index] != self.sensing_range[:, sensor_index])
+            if len(changed) == 0:
+                continue
+            for envs in self.__groups(changed, sensor_index, self.applied_range, self.sensing_range):
+                (x, y, radius_to, width, length) = self.__disk(envs[0], sensor_index, self.sensing_range)
+                radius_from = int(self.applied_range[envs[0], sensor_index])
+                window = ring_window(x, y, radius_from, radius_to, width, length)
+                if window is not None:
+                    (slices, stencil) = window
+                    self.counts[(envs, *slices)] += stencil
+            self.applied_range[changed, sensor_index] = self.sensing_range[changed, sensor_index]
+
+    def __update_jitter(self):
+        stale = np.nonzero(self.__jitter_stale)[0]
+        if len(stale) == 0:
+            return
+        self.jitter[stale] = batch_jitter(self.sens_frequency[stale], self.sens_offset[stale],
+                                          self.jitter_time_max[stale])
+        self.__jitter_stale[:] = False
+
@@ -0,0 +1,155 @@
+import numpy as np
+
+from sensing_coverage.stencil import disk_window
+
+
+class WindowMask:
+    """
+    A bool mask of a map stored only within its bounding window: a 2D bool array and position of its first cell on the
+    map. Memory used by a mask of a sensor's area is proportional to sensor's range instead of the map size.
+
+
+    Attributes
+    ----------
+    offset_x: number
+        map x position of the first row of the window
+    offset_y: number
+        map y position of the first column of the window
+    mask: 2D bool array
+        True means map position (offset_x + i, offset_y + j) belongs to the mask
+    width: number
+        width of the map
+    length: number
+        length of the map
+    """
+
+    def __init__(self, offset_x, offset_y, mask, width, length):
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.mask = mask
+        self.width = width
+        self.length = length
+
+    @classmethod
+    def empty(cls, width, length):
+        return cls(0, 0, np.full((0, 0), False), width, length)
+
+    @classmethod
+    def from_window(cls, window, width, length):
+        """
+        :param window: tuple (slices, stencil) as returned by stencil.disk_window or None
+        """
+        if window is None:
+            return cls.empty(width, length)
+        (slices, stencil) = window
+        return cls(slices[0].start, slices[1].start, stencil, width, length)
+
+    @classmethod
+    def disk(cls, x, y, radius, width, length):
+        """
+        :return: mask of positions within radius from (x, y) on width x length map
+        """
+        return cls.from_window(disk_window(x, y, radius, width, length), width, length)
+
+    @classmethod
+    def from_dense(cls, area):
+        """
+        :return: mask of True positions of given 2D bool array of the whole map, cut to their bounding window
+        """
+        (rows, columns) = (np.flatnonzero(area.any(axis=1)), np.flatnonzero(area.any(axis=0)))
+        if len(rows) == 0:
+            return cls.empty(area.shape[0], area.shape[1])
+        window = area[rows[0]:rows[-1] + 1, columns[0]:columns[-1] + 1].copy()
+        return cls(int(rows[0]), int(columns[0]), window, area.shape[0], area.shape[1])
+
+    @property
+    def slices(self):
+        """
+        :return: pair of slices selecting the window on the map
+        """
+        return (slice(self.offset_x, self.offset_x + self.mask.shape[0]),
+                slice(self.offset_y, self.offset_y + self.mask.shape[1]))
+
+    def is_empty(self):
+        return self.mask.size == 0
+
+    def count(self):
+        """
+        :return: amount of map positions belonging to the mask
+        """
+        return int(np.count_nonzero(self.mask))
+
+    def to_dense(self):
+        """
+        :return: 2D bool array of the whole map
+        """
+        area = np.full((self.width, self.length), False)
+        area[self.slices] = self.mask
+        return area
+
+    def crop(self, offset_x, offset_y, width, length):
+        """
+        :return: 2D bool array of given window of the map filled with this mask's values
+        """
+        result = np.full((width, length), False)
+        min_x = max(offset_x, self.offset_x)
+        min_y = max(offset_y, self.offset_y)
+        max_x = min(offset_x + width, self.offset_x + self.mask.shape[0])
+        max_y = min(offset_y + length, self.offset_y + self.mask.shape[1])
+        if min_x < max_x and min_y < max_y:
+            result[min_x - offset_x:max_x - offset_x, min_y - offset_y:max_y - offset_y] = \
+                self.mask[min_x - self.offset_x:max_x - self.offset_x, min_y - self.offset_y:max_y - self.offset_y]
+        return result
+
+    def union(self, other):
+        """
+        :return: mask of positions belonging to any of both masks, its window is bounding box of both windows
+        """
+        if self.is_empty():
+            return other
+        if other.is_empty():
+            return self
+        offset_x = min(self.offset_x, other.offset_x)
+        offset_y = min(self.offset_y, other.offset_y)
+        width = max(self.offset_x + self.mask.shape[0], other.offset_x + other.mask.shape[0]) - offset_x
+        length = max(self.offset_y + self.mask.shape[1], other.offset_y + other.mask.shape[1]) - offset_y
+        mask = self.crop(offset_x, offset_y, width, length) | other.crop(offset_x, offset_y, width, length)
+        return WindowMask(offset_x, offset_y, mask, self.width, self.length)
+
+    def intersect(self, other):
+        """
+        :return: mask of positions belonging to both masks, its window is common part of both windows
+        """
+        offset_x = max(self.offset_x, other.offset_x)
+        offset_y = max(self.offset_y, other.offset_y)
+        width = min(self.offset_x + self.mask.shape[0], other.offset_x + other.mask.shape[0]) - offset_x
+        length = min(self.offset_y + self.mask.shape[1], other.offset_y + other.mask.shape[1]) - offset_y
+        if self.is_empty() or other.is_empty() or width <= 0 or length <= 0:
+            return WindowMask.empty(self.width, self.length)
+        mask = self.crop(offset_x, offset_y, width, length) & other.crop(offset_x, offset_y, width, length)
+        return WindowMask(offset_x, offset_y, mask, self.width, self.length)
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __and__(self, other):
+        return self.intersect(other)
+
+    @staticmethod
+    def union_all(masks, width, length):
+        """
+        :return: union of all given masks computed at once within their common bounding window
+        """
+        masks = [mask for mask in masks if not mask.is_empty()]
+        if not masks:
+            return WindowMask.empty(width, length)
+        offset_x = min(mask.offset_x for mask in masks)
+        offset_y = min(mask.offset_y for mask in masks)
+        window_width = max(mask.offset_x + mask.mask.shape[0] for mask in masks) - offset_x
+        window_length = max(mask.offset_y + mask.mask.shape[1] for mask in masks) - offset_y
+        result = np.full((window_width, window_length), False)
+        for mask in masks:
+            (slices_x, slices_y) = mask.slices
+            result[slices_x.start - offset_x:slices_x.stop - offset_x,
+                   slices_y.start - offset_y:slices_y.stop - offset_y] |= mask.mask
+        return WindowMask(offset_x, offset_y, result, width, length)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from sensing_coverage.circle_union import union_area
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+rect = (-0.5, -0.5, 9.5, 9.5)
+
+
+def raster_area(circles, rect, clip=None, resolution=1000):
+    # area estimated from centers of resolution x resolution cells of the rectangle
+    (min_x, min_y, max_x, max_y) = rect
+    step_x = (max_x - min_x) / resolution
+    step_y = (max_y - min_y) / resolution
+    xx = (min_x + (np.arange(resolution) + 0.5) * step_x)[:, None]
+    yy = (min_y + (np.arange(resolution) + 0.5) * step_y)[None, :]
+    inside = np.full((resolution, resolution), False)
+    for (x, y, radius) in circles:
+        inside |= (xx - x) ** 2 + (yy - y) ** 2 <= radius ** 2
+    if clip is not None:
+        inside &= (xx - clip[0]) ** 2 + (yy - clip[1]) ** 2 <= clip[2] ** 2
+    return np.count_nonzero(inside) * step_x * step_y
+
+
+@pytest.mark.parametrize('circles, clip', [
+    ([(0, 4, 3), (0, 4, 3)], (0, 4, 3)),
+    ([(5, 5, 3)], (5, 5, 3)),
+    ([(5, 5, 4), (7, 5, 2)], (5, 5, 3)),
+    ([(5, 5, 2), (6, 6, 3)], (5, 5, 3)),
+    ([(1, 1, 2), (3, 2, 2.5), (8, 8, 1)], None),
+    ([(2, 2, 3), (2, 2, 3), (4, 3, 1)], (3, 3, 2)),
+])
+def test_union_area_matches_raster(circles, clip):
+    assert union_area(circles, rect, clip) == pytest.approx(raster_area(circles, rect, clip), abs=0.05)
+
+
+def test_sensing_range_equal_to_operational_range():
+    sensor = Sensor(0, 5, 5, sensing_range=3, max_sensing_range=3, operational_range=3)
+    env = SensingCoverageParallel(SensingEnvironment({0: sensor}, width=10, length=10, backend='analytic'), alpha=0.4)
+    (observations, rewards, dones, infos) = env.step({})
+    assert observations[0]['local']['coverage'] == pytest.approx(1.0)
+    assert rewards[0] == pytest.approx(0.4 + 0.6 / 3)
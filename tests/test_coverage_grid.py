@@ -0,0 +1,40 @@
+import numpy as np
+
+from sensing_coverage.coverage_grid import CoverageGrid
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+def raster_counts(env):
+    (xx, yy) = np.ogrid[:env.width, :env.length]
+    counts = np.zeros((env.width, env.length), dtype=np.int32)
+    for sensor in env.sensors.values():
+        counts += (xx - sensor.x) ** 2 + (yy - sensor.y) ** 2 <= sensor.sensing_range ** 2
+    return counts
+
+
+def test_incremental_updates_match_rebuild():
+    rng = np.random.default_rng(0)
+    sensors = {sensor_id: Sensor(sensor_id, int(rng.integers(-2, 32)), int(rng.integers(-2, 27)),
+                                 sensing_range=int(rng.integers(6)), max_sensing_range=6, operational_range=8)
+               for sensor_id in range(30)}
+    env = SensingEnvironment(sensors, width=30, length=25)
+    grid = env.coverage_grid.refresh()
+    for step in range(40):
+        for sensor in list(env.sensors.values()):
+            change = rng.integers(6)
+            if change < 3:
+                # ring updates of sensing_range growing and shrinking, including to and from 0
+                sensor.adjust_sensing_range(int(rng.integers(-3, 4)))
+            elif change == 3:
+                sensor.set_coordinates(float(rng.uniform(-2, 32)), float(rng.uniform(-2, 27)))
+        if step == 10:
+            env.get_sensor(5).crash()
+        if step == 20:
+            env.remove_sensor(env.get_sensor(7))
+        grid.refresh()
+        rebuilt = CoverageGrid(env).refresh()
+        assert np.array_equal(grid.counts, rebuilt.counts)
+        assert np.array_equal(grid.counts, raster_counts(env))
+        assert np.array_equal(grid.covered, rebuilt.covered)
+        assert grid.covered_cells == rebuilt.covered_cells == np.count_nonzero(rebuilt.counts)
@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+import pytest
+
+from sensing_coverage.jitter import jitter
+
+
+def reference_jitter(frequencies, offsets, time_max):
+    measures = set()
+    for (frequency, offset) in zip(frequencies, offsets):
+        if frequency > 0:
+            measures.update(range(offset, time_max, frequency))
+        elif offset < time_max:
+            measures.add(offset)
+    gaps = np.diff(sorted(measures))
+    if len(gaps) == 0:
+        return 0.0
+    return math.sqrt(((gaps - gaps.mean()) ** 2).sum())
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_hyperperiod_jitter_matches_timeline(seed):
+    rng = np.random.default_rng(seed)
+    sensors_amount = int(rng.integers(1, 7))
+    frequencies = rng.integers(0, 13, sensors_amount)
+    # some sensors measure only once and some start at or after time_max
+    frequencies[rng.random(sensors_amount) < 0.2] = 0
+    time_max = int(rng.integers(1, 3000))
+    offsets = rng.integers(0, 40, sensors_amount)
+    offsets[rng.random(sensors_amount) < 0.2] = time_max + int(rng.integers(2))
+    expected = reference_jitter(frequencies.tolist(), offsets.tolist(), time_max)
+    assert jitter(frequencies, offsets, time_max) == pytest.approx(expected, rel=1e-9, abs=1e-9)
+    for max_hyperperiod in (1, 12, 10 ** 6):
+        assert jitter(frequencies, offsets, time_max, max_hyperperiod) == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize(('frequencies', 'offsets', 'time_max'), [
+    ([0, 0], [3, 9], 100),
+    ([0, 5], [7, 2], 100),
+    ([4, 6], [100, 0], 100),
+    ([4, 6], [99, 100], 100),
+    ([3], [0], 1000),
+    ([0], [0], 1),
+])
+def test_hyperperiod_jitter_edge_cases(frequencies, offsets, time_max):
+    expected = reference_jitter(frequencies, offsets, time_max)
+    assert jitter(frequencies, offsets, time_max, max_hyperperiod=10 ** 6) == pytest.approx(expected, abs=1e-9)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from sensing_coverage.quadtree import covered_cells
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+def raster_covered_cells(disks, width, length):
+    (xx, yy) = np.ogrid[:width, :length]
+    covered = np.full((width, length), False)
+    for (x, y, radius) in disks:
+        covered |= (xx - x) ** 2 + (yy - y) ** 2 <= radius ** 2
+    return int(np.count_nonzero(covered))
+
+
+def random_disks(seed, width, length, amount=40):
+    rng = np.random.default_rng(seed)
+    return np.column_stack((rng.uniform(-5, width + 5, amount), rng.uniform(-5, length + 5, amount),
+                            rng.integers(0, 15, amount)))
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize(('width', 'length'), [(64, 64), (97, 41), (1, 30)])
+def test_exact_count_matches_raster(seed, width, length):
+    disks = random_disks(seed, width, length)
+    assert covered_cells(disks, width, length) == raster_covered_cells(disks, width, length)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('tolerance', [0.001, 0.01, 0.1])
+def test_estimation_error_is_within_tolerance(seed, tolerance):
+    (width, length) = (120, 90)
+    disks = random_disks(seed, width, length)
+    error = abs(covered_cells(disks, width, length, tolerance) - raster_covered_cells(disks, width, length))
+    assert error <= tolerance * width * length
+
+
+def test_no_disks():
+    assert covered_cells(np.zeros((0, 3)), 10, 10) == 0
+
+
+def test_quadtree_backend_matches_numpy_backend():
+    rng = np.random.default_rng(0)
+    envs = []
+    for backend in ('numpy', 'quadtree'):
+        sensors = {sensor_id: Sensor(sensor_id, x, y, sensing_range=radius, max_sensing_range=10, operational_range=10)
+                   for (sensor_id, (x, y, radius)) in enumerate(random_disks(1, 80, 70, amount=30).tolist())}
+        envs.append(SensingEnvironment(sensors, width=80, length=70, backend=backend))
+    for _ in range(5):
+        ranges_diff = rng.integers(-3, 4, 30)
+        for env in envs:
+            for (sensor, diff) in zip(env.sensors.values(), ranges_diff.tolist()):
+                sensor.adjust_sensing_range(diff)
+        assert envs[1].get_covered_area() == envs[0].get_covered_area()
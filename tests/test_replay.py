@@ -0,0 +1,51 @@
+import numpy as np
+
+from sensing_coverage.replay import Replay
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+from sensing_coverage.trajectory import Trajectory, TrajectoryRecorder
+
+
+def record(directory, steps=60, crash_step=25):
+    rng = np.random.default_rng(0)
+    sensors = {sensor_id: Sensor(sensor_id, int(rng.integers(20)), int(rng.integers(20)), sensing_range=3,
+                                 max_sensing_range=5, operational_range=6) for sensor_id in range(8)}
+    env = SensingCoverageParallel(SensingEnvironment(sensors, width=20, length=20),
+                                  recorder=TrajectoryRecorder(directory, chunk_steps=16))
+    for step in range(steps):
+        if step == crash_step:
+            sensors[2].crash()
+        env.step({sensor_id: tuple(action) for (sensor_id, action)
+                  in zip(sensors, rng.integers(-1, 2, (len(sensors), 3)).tolist())})
+    env.close()
+    return Trajectory(directory)
+
+
+def test_replay_of_crash_matches_recording(tmp_path):
+    trajectory = record(str(tmp_path))
+    replay = Replay(trajectory, checkpoint_interval=10)
+    for (index, observations, rewards) in replay.run(0):
+        assert replay.divergence() == []
+        assert np.allclose(observations, trajectory['observations'][index])
+        assert np.allclose(rewards, trajectory['rewards'][index])
+
+
+def test_seek_past_crash_matches_recording(tmp_path):
+    trajectory = record(str(tmp_path))
+    replay = Replay(trajectory, checkpoint_interval=10)
+    replay.seek(len(trajectory))
+    assert replay.divergence() == []
+    replay.seek(20)
+    for (index, observations, rewards) in replay.run(20, 40):
+        assert np.allclose(observations, trajectory['observations'][index])
+
+
+def test_replay_of_sensor_crashed_before_recording(tmp_path):
+    trajectory = record(str(tmp_path), steps=20, crash_step=0)
+    assert trajectory.initial['sensors'][2][-1]
+    replay = Replay(trajectory, checkpoint_interval=10)
+    for (index, observations, rewards) in replay.run(0):
+        assert replay.divergence() == []
+        assert np.allclose(observations, trajectory['observations'][index])
+        assert np.allclose(rewards, trajectory['rewards'][index])
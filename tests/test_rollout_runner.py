@@ -0,0 +1,64 @@
+import functools
+import time
+
+import numpy as np
+import pytest
+
+from sensing_coverage.rollout_runner import RolloutRunner
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+class FlakyEnv(SensingCoverageParallel):
+    """
+    Environment which step of given number fails and every step of which takes at least given delay
+    """
+
+    def __init__(self, env, fail_at=None, delay=0.0):
+        super().__init__(env)
+        self.fail_at = fail_at
+        self.delay = delay
+        self.steps = 0
+
+    def step(self, actions):
+        self.steps += 1
+        if self.steps == self.fail_at:
+            raise RuntimeError('step failed')
+        time.sleep(self.delay)
+        return super().step(actions)
+
+
+def create_env(fail_at=None, delay=0.0):
+    sensors = {sensor_id: Sensor(sensor_id, 3 * sensor_id, 2 * sensor_id, sensing_range=1) for sensor_id in range(4)}
+    return FlakyEnv(SensingEnvironment(sensors, width=12, length=12), fail_at, delay)
+
+
+def failing_factory():
+    raise ValueError('factory failed')
+
+
+def test_failing_factory_is_reported():
+    with pytest.raises(ValueError, match='factory failed'):
+        RolloutRunner([create_env, failing_factory], processes=2)
+
+
+def test_step_after_failed_step_waits_for_all_workers():
+    actions = np.random.default_rng(0).integers(-1, 2, (3, 4, 3))
+    actions[:, :, 1:] = 0
+    (failing_reference, slow_reference) = (create_env(), create_env())
+    failing_reference.array_output = slow_reference.array_output = True
+    with RolloutRunner([functools.partial(create_env, fail_at=2), functools.partial(create_env, delay=0.3)],
+                       processes=2) as runner:
+        runner.step([actions[0]] * 2)
+        with pytest.raises(RuntimeError, match='step failed'):
+            runner.step([actions[1]] * 2)
+        (observations, rewards) = runner.step([actions[2]] * 2)
+        # the failing environment skipped the second step, the slow one made all three
+        for step in (0, 2):
+            failing_reference.step(actions[step])
+        for step in range(3):
+            slow_reference.step(actions[step])
+        assert np.array_equal(observations[0], failing_reference.observations)
+        assert np.array_equal(observations[1], slow_reference.observations)
+        assert np.array_equal(rewards[1], slow_reference.rewards)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+def create_env(seed, backend, width=60, length=50, coverage_samples=4096):
+    rng = np.random.default_rng(seed)
+    sensors = {}
+    for sensor_id in range(20):
+        sensors[sensor_id] = Sensor(sensor_id, float(rng.uniform(-2, width + 1)), float(rng.uniform(-2, length + 1)),
+                                    sensing_range=int(rng.integers(9)), max_sensing_range=8, operational_range=10)
+    return SensingEnvironment(sensors, width, length, backend=backend, coverage_samples=coverage_samples)
+
+
+def estimates(env, sensor_id):
+    sensor = env.get_sensor(sensor_id)
+    return np.array([env.get_covered_area(), env.get_covered_area_for_sensor_operational_range(sensor),
+                     env.get_covered_by_other_sensors(sensor), env.get_operational_max_for_sensor(sensor)])
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('coverage_samples', [4096, 65536])
+def test_estimates_are_close_to_counts_of_numpy_backend(seed, coverage_samples):
+    exact_env = create_env(seed, 'numpy')
+    sampled_env = create_env(seed, 'sampling', coverage_samples=coverage_samples)
+    area = exact_env.get_area()
+    for sensor_id in (0, 3, 11):
+        # error of low-discrepancy sampling is about 0.5% of map area with 4096 points
+        assert np.all(np.abs(estimates(sampled_env, sensor_id) - estimates(exact_env, sensor_id)) <= 0.02 * area)
+
+
+def test_estimates_follow_changes_of_sensors():
+    (exact_env, sampled_env) = (create_env(0, 'numpy'), create_env(0, 'sampling'))
+    area = exact_env.get_area()
+    for env in (exact_env, sampled_env):
+        env.get_sensor(3).crash()
+        env.get_sensor(5).set_coordinates(30.5, 24.25)
+        env.get_sensor(5).adjust_sensing_range(8)
+    for sensor_id in (3, 5):
+        assert np.all(np.abs(estimates(sampled_env, sensor_id) - estimates(exact_env, sensor_id)) <= 0.02 * area)
+
+
+def test_full_and_empty_coverage():
+    sensor = Sensor(0, 10, 10, sensing_range=40, max_sensing_range=40, operational_range=40)
+    env = SensingEnvironment({0: sensor}, 20, 20, backend='sampling', coverage_samples=1000)
+    assert env.get_covered_area() == pytest.approx(env.get_area())
+    sensor.adjust_sensing_range(-40)
+    assert env.get_covered_area() <= 0.01 * env.get_area()
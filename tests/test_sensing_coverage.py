@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+def create_env(local_workers=None, seed=0, width=40, length=30):
+    rng = np.random.default_rng(seed)
+    sensors = {}
+    for sensor_id in range(25):
+        max_range = int(rng.integers(1, 8))
+        # positions off the grid and near borders check that disks match the stencils of the grid
+        (x, y) = (float(rng.uniform(-2, width + 1)), float(rng.uniform(-2, length + 1)))
+        sensors[sensor_id] = Sensor(sensor_id, x, y, sensing_range=int(rng.integers(max_range + 1)),
+                                    max_sensing_range=max_range, operational_range=max_range + int(rng.integers(4)))
+    env = SensingEnvironment(sensors, width=width, length=length)
+    return SensingCoverageParallel(env, max_sensing_range=8, local_workers=local_workers, array_output=True)
+
+
+def expected_local_coverages(env):
+    expected = []
+    for (sensor_id, sensor) in env.get_sensors():
+        operational_max = env.get_operational_max_for_sensor(sensor)
+        covered = env.get_covered_area_for_sensor_operational_range(sensor)
+        expected.append((covered / operational_max if operational_max > 0 else 0,
+                         env.get_covered_by_other_sensors(sensor) / env.get_area()))
+    return np.array(expected)
+
+
+@pytest.mark.parametrize('local_workers', [None, 1, 3, 40])
+def test_local_coverages_match_queries_of_single_sensors(local_workers):
+    parallel_env = create_env(local_workers)
+    rng = np.random.default_rng(1)
+    for step in range(12):
+        actions = rng.integers(-2, 3, (25, 3))
+        if step == 5:
+            parallel_env.env.get_sensor(3).crash()
+        if step == 8:
+            parallel_env.env.get_sensor(7).set_coordinates(11.5, 12.25)
+        observations = parallel_env.step(actions)[0]
+        assert np.array_equal(observations[:, 3:5], expected_local_coverages(parallel_env.env))
+    parallel_env.close()
+
+
+def test_chunks_keep_order_of_sensors():
+    (serial_env, threaded_env) = (create_env(), create_env(local_workers=4))
+    for _ in range(3):
+        actions = np.ones((25, 3), dtype=np.int64)
+        assert np.array_equal(serial_env.step(actions)[0], threaded_env.step(actions)[0])
+    threaded_env.close()
+    assert threaded_env.executor is None
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+
+
+def create_sensors():
+    return {0: Sensor(0, 2, 2, sensing_range=2, sens_frequency=10), 1: Sensor(1, 6, 6, sensing_range=2,
+                                                                              sens_frequency=15)}
+
+
+def test_sensors_of_another_environment_are_rejected():
+    sensors = create_sensors()
+    env = SensingEnvironment(sensors, width=10, length=10)
+    with pytest.raises(ValueError):
+        SensingEnvironment(sensors, width=10, length=10)
+    # the first environment still follows its sensors
+    sensors[0].adjust__frequency(10)
+    assert env.registry.sens_frequency.tolist() == [20, 15]
+
+
+def test_removed_sensor_can_be_used_by_another_environment():
+    sensors = create_sensors()
+    env = SensingEnvironment(sensors, width=10, length=10)
+    removed = sensors[1]
+    env.remove_sensor(removed)
+    other = SensingEnvironment({1: removed}, width=10, length=10)
+    assert other.get_sensor(1) is removed
+    assert len(env.registry) == 1
+
+
+def create_parallel_env():
+    rng = np.random.default_rng(0)
+    sensors = {sensor_id: Sensor(sensor_id, int(rng.integers(20)), int(rng.integers(20)), sensing_range=2,
+                                 max_sensing_range=4, operational_range=5) for sensor_id in range(6)}
+    return SensingCoverageParallel(SensingEnvironment(sensors, width=20, length=20), array_output=True)
+
+
+def mutate(parallel_env):
+    env = parallel_env.env
+    parallel_env.step(np.ones((6, 3), dtype=np.int64))
+    env.get_sensor(1).crash()
+    env.get_sensor(4).set_coordinates(7.5, 3)
+    parallel_env.step(np.full((6, 3), -1, dtype=np.int64))
+
+
+def test_set_state_restores_snapshot():
+    parallel_env = create_parallel_env()
+    actions = np.array([[1, 2, 1], [-1, 0, 3], [2, -1, 0], [0, 1, 1], [-2, 0, 0], [1, 1, -1]])
+    parallel_env.step(actions)
+    state = parallel_env.get_state()
+    counts = parallel_env.env.coverage_grid.counts.copy()
+    (observations, rewards) = (array.copy() for array in parallel_env.step(actions)[:2])
+    next_counts = parallel_env.env.coverage_grid.counts.copy()
+
+    mutate(parallel_env)
+    parallel_env.set_state(state)
+    assert np.array_equal(parallel_env.env.coverage_grid.counts, counts)
+    (restored_observations, restored_rewards) = parallel_env.step(actions)[:2]
+    assert np.array_equal(restored_observations, observations)
+    assert np.array_equal(restored_rewards, rewards)
+    assert np.array_equal(parallel_env.env.coverage_grid.counts, next_counts)
+    assert parallel_env.env.coverage_grid.covered_cells == np.count_nonzero(next_counts)
+
+
+def test_set_state_without_grid():
+    parallel_env = create_parallel_env()
+    assert not parallel_env.env.coverage_grid.valid
+    state = parallel_env.get_state()
+    assert state[:16].view(np.int64).tolist() == [6, 0]
+    (observations, rewards) = (array.copy() for array in create_parallel_env().step(np.ones((6, 3), dtype=int))[:2])
+
+    mutate(parallel_env)
+    parallel_env.set_state(state)
+    (restored_observations, restored_rewards) = parallel_env.step(np.ones((6, 3), dtype=int))[:2]
+    assert np.array_equal(restored_observations, observations)
+    assert np.array_equal(restored_rewards, rewards)
+
+
+def test_get_state_reuses_buffer():
+    parallel_env = create_parallel_env()
+    parallel_env.step(np.ones((6, 3), dtype=np.int64))
+    state = parallel_env.get_state()
+    snapshot = state.copy()
+    mutate(parallel_env)
+    assert parallel_env.get_state(out=state) is state
+    assert not np.array_equal(state, snapshot)
+    parallel_env.set_state(snapshot)
+    assert np.array_equal(parallel_env.get_state(out=state), snapshot)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from sensing_coverage.sensing_coverage import SensingCoverageParallel, observation_columns
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+from sensing_coverage.trajectory import Trajectory, TrajectoryRecorder, state_columns
+
+
+def create_env(directory, chunk_steps):
+    rng = np.random.default_rng(0)
+    sensors = {sensor_id: Sensor(sensor_id, int(rng.integers(20)), int(rng.integers(20)), sensing_range=3,
+                                 max_sensing_range=5, operational_range=6) for sensor_id in (4, 9, 1, 7, 2)}
+    return SensingCoverageParallel(SensingEnvironment(sensors, width=20, length=20), array_output=True,
+                                   recorder=TrajectoryRecorder(directory, chunk_steps=chunk_steps))
+
+
+@pytest.mark.parametrize('steps', [3, 4, 10])
+def test_steps_across_chunks_are_read_back(tmp_path, steps):
+    env = create_env(str(tmp_path), chunk_steps=4)
+    rng = np.random.default_rng(1)
+    expected = {'actions': [], 'observations': [], 'rewards': []}
+    expected.update({name: [] for (name, dtype) in state_columns})
+    for step in range(steps):
+        if step == 2:
+            env.env.get_sensor(9).crash()
+        actions = rng.integers(-1, 2, (5, 3))
+        (observations, rewards, dones, infos) = env.step(actions)
+        expected['actions'].append(actions)
+        # arrays returned by step are overwritten by the next step
+        expected['observations'].append(observations.copy())
+        expected['rewards'].append(rewards.copy())
+        for (name, dtype) in state_columns:
+            expected[name].append(getattr(env.env.registry, name).copy())
+        if step >= 3:
+            # only whole chunks are written before the recorder is closed
+            assert len(Trajectory(str(tmp_path))) == (step + 1) // 4 * 4
+    env.close()
+
+    trajectory = Trajectory(str(tmp_path))
+    assert len(trajectory) == steps
+    assert trajectory.sensor_ids == [4, 9, 1, 7, 2]
+    assert trajectory['actions'].shape == (steps, 5, 3)
+    assert trajectory['observations'].shape == (steps, 5, len(observation_columns))
+    assert trajectory['rewards'].shape == (steps, 5)
+    for (name, values) in expected.items():
+        assert np.array_equal(trajectory[name], np.array(values)), name
+    assert np.array_equal(trajectory.observation('local_coverage'), np.array(expected['observations'])[:, :, 3])
+
+
+def test_flush_makes_buffered_steps_visible(tmp_path):
+    env = create_env(str(tmp_path), chunk_steps=100)
+    for _ in range(5):
+        env.step(np.zeros((5, 3), dtype=np.int64))
+    env.recorder.flush()
+    assert len(Trajectory(str(tmp_path))) == 5
+    for _ in range(3):
+        env.step(np.ones((5, 3), dtype=np.int64))
+    env.close()
+    trajectory = Trajectory(str(tmp_path))
+    assert len(trajectory) == 8
+    assert np.array_equal(trajectory['actions'][:, :, 0], np.repeat([[0], [1]], [5, 3], axis=0).repeat(5, axis=1))
+    assert trajectory.initial['environment']['width'] == 20
+
+
+def test_record_after_close_fails(tmp_path):
+    env = create_env(str(tmp_path), chunk_steps=4)
+    env.step(np.zeros((5, 3), dtype=np.int64))
+    env.close()
+    with pytest.raises(AssertionError):
+        env.step(np.zeros((5, 3), dtype=np.int64))
@@ -0,0 +1,46 @@
+import numpy as np
+
+from sensing_coverage.jitter import batch_jitter, jitter
+from sensing_coverage.sensing_coverage import SensingCoverageParallel
+from sensing_coverage.sensing_environment import SensingEnvironment
+from sensing_coverage.sensor import Sensor
+from sensing_coverage.vector_sensing_coverage import VectorSensingCoverage
+
+
+def create_env(seed, width=11, length=9, sensors_amount=6):
+    rng = np.random.default_rng(seed)
+    sensors = {}
+    for sensor_id in range(sensors_amount):
+        max_range = int(rng.integers(1, 7))
+        sensors[sensor_id] = Sensor(sensor_id, int(rng.integers(width)), int(rng.integers(length)),
+                                    sensing_range=int(rng.integers(max_range + 1)), max_sensing_range=max_range,
+                                    operational_range=max_range + int(rng.integers(4)),
+                                    sens_frequency=int(rng.integers(15, 41)), sens_offset=int(rng.integers(31)))
+    return SensingEnvironment(sensors, width, length, jitter_time_max=int(rng.choice([100, 1000])))
+
+
+def test_step_matches_parallel_env():
+    envs = [create_env(seed) for seed in range(5)]
+    alphas = np.linspace(0, 1, len(envs))
+    vector_env = VectorSensingCoverage(envs, alpha=alphas)
+    parallel_envs = [SensingCoverageParallel(env, alpha=alpha, array_output=True) for (env, alpha) in zip(envs, alphas)]
+    rng = np.random.default_rng(0)
+    for step in range(20):
+        actions = rng.integers(-2, 3, (len(envs), vector_env.sensors_amount, 3))
+        if step == 8:
+            vector_env.crash(1, 0)
+            envs[1].get_sensor(0).crash()
+        (observations, rewards, dones, infos) = vector_env.step(actions)
+        for (env_index, parallel_env) in enumerate(parallel_envs):
+            (expected_observations, expected_rewards, _, _) = parallel_env.step(actions[env_index])
+            assert np.allclose(observations[env_index], expected_observations)
+            assert np.allclose(rewards[env_index], expected_rewards)
+
+
+def test_batch_jitter_matches_jitter():
+    rng = np.random.default_rng(1)
+    frequencies = rng.integers(0, 30, (8, 5))
+    offsets = rng.integers(0, 40, (8, 5))
+    time_max = rng.integers(1, 300, 8)
+    expected = [jitter(frequencies[row], offsets[row], time_max[row]) for row in range(len(time_max))]
+    assert np.allclose(batch_jitter(frequencies, offsets, time_max), expected)